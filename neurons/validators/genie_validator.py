@@ -33,6 +33,10 @@ from webgenie.protocol import (
     WebgenieTextSynapse,
     verify_answer_hash,
 )
+from webgenie.rewards.visual_reward.ground_truth import (
+    discard_ground_truth_features,
+    sweep_ground_truth_features,
+)
 from webgenie.storage import store_results_to_database
 from webgenie.tasks import Solution
 from webgenie.tasks.metric_types import (
@@ -56,7 +60,16 @@ class GenieValidator:
             (ImageTaskGenerator(), 1.0), # currently only image task generator is supported
         ]
 
+        # Features published by a previous run are never released by their tasks
+        sweep_ground_truth_features()
+
+    def discard_task(self, task):
+        # Tasks of other types carry no ground truth features
+        discard_ground_truth_features(getattr(task, "ground_truth_features", None))
+
     async def query_miners(self):
+        task = None
+        queued = False
         try:
             with self.lock:
                 if len(self.miner_results) > MAX_COMPETETION_HISTORY_SIZE:
@@ -132,10 +145,25 @@ class GenieValidator:
             bt.logging.info(f"Received {len(solutions)} valid solutions")
             with self.lock:
                 self.miner_results.append(challenge)
+            queued = True
 
         except Exception as e:
             bt.logging.error(f"Error in query_miners: {e}")
             raise e
+        finally:
+            if task is not None and not queued:
+                # The task is dropped before it reaches score()
+                self.discard_task(task)
+
+    def get_timeout_counts(self, task) -> dict[str, dict[int, int]]:
+        # Stage deadlines each miner exceeded so far, gathered from the metrics that count them
+        timeout_counts = {}
+        metrics = getattr(task.generator, "metrics", {})
+        for reward_model in metrics.values():
+            if hasattr(reward_model, "get_timeout_counts"):
+                for stage, counts in reward_model.get_timeout_counts().items():
+                    timeout_counts.setdefault(stage, {}).update(counts)
+        return timeout_counts
 
     async def score(self):
         with self.lock:
@@ -145,6 +173,13 @@ class GenieValidator:
 
             challenge = self.miner_results.pop(0)
 
+        try:
+            await self.score_challenge(challenge)
+        finally:
+            # Scored or skipped, the task is done with its ground truth features
+            self.discard_task(challenge.task)
+
+    async def score_challenge(self, challenge):
         if not challenge.solutions:
             # No solutions to score
             return
@@ -161,6 +196,7 @@ class GenieValidator:
         solutions = challenge.solutions
         miner_uids = [solution.miner_uid for solution in solutions]
         aggregated_scores, scores = await challenge.calculate_scores()
+        timeout_counts = self.get_timeout_counts(challenge.task)
         
         # Create a rich table to display the scoring results
         table = Table(
@@ -180,6 +216,7 @@ class GenieValidator:
         table.add_column("Accuracy", justify="right")
         table.add_column("SEO", justify="right") 
         table.add_column("Code Quality", justify="right")
+        table.add_column("Timeouts", justify="right", style="yellow")
 
         for i, miner_uid in enumerate(miner_uids):
             table.add_row(
@@ -187,7 +224,12 @@ class GenieValidator:
                 f"{aggregated_scores[i]:.4f}",
                 f"{scores[ACCURACY_METRIC_NAME][i]:.4f}",
                 f"{scores[SEO_METRIC_NAME][i]:.4f}",
-                f"{scores[QUALITY_METRIC_NAME][i]:.4f}"
+                f"{scores[QUALITY_METRIC_NAME][i]:.4f}",
+                ", ".join(
+                    f"{stage} {counts[miner_uid]}"
+                    for stage, counts in timeout_counts.items()
+                    if miner_uid in counts
+                ),
             )
 
         console = Console()
@@ -293,6 +335,7 @@ class GenieValidator:
                 return
             
             bt.logging.info(f"Forwarding task #{task_index} in session #{session}")
+            sweep_ground_truth_features()
             seed = self.get_seed(session, task_index)
             
             bt.logging.info(f"Init random with seed: {seed}")
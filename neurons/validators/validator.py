@@ -33,6 +33,7 @@ from webgenie.constants import (
 )
 from webgenie.protocol import WebgenieTextSynapse, WebgenieImageSynapse
 from webgenie.rewards.lighthouse_reward import start_lighthouse_server_thread, stop_lighthouse_server
+from webgenie.rewards.worker_pool import start_scoring_worker_pool, stop_scoring_worker_pool
 from webgenie.storage import send_challenge_to_stats_collector
 from webgenie.utils.uids import get_validator_index
 
@@ -364,6 +365,7 @@ class Validator(BaseValidatorNeuron):
             #self.score_thread.start()
             self.sync_thread.start()        
             start_lighthouse_server_thread()
+            start_scoring_worker_pool()
             bt.logging.info("Started background threads")
             bt.logging.info("=" * 40)
     
@@ -378,6 +380,7 @@ class Validator(BaseValidatorNeuron):
             #self.score_thread.join(5)
             self.sync_thread.join(5)
             stop_lighthouse_server()
+            stop_scoring_worker_pool()
 
             #self.synthensize_task_thread = None
             self.query_miners_thread = None
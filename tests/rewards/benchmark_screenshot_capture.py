@@ -0,0 +1,65 @@
+import asyncio
+import sys
+import os
+import time
+import numpy as np
+from dotenv import load_dotenv, find_dotenv
+def init_test():
+    parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(parent_dir)
+    load_dotenv(find_dotenv(filename=".env.validator"))
+
+init_test()
+
+
+from webgenie.rewards.visual_reward.common.browser import start_browser, stop_browser
+from webgenie.rewards.visual_reward.common.render_artifact import render_html_artifact
+from webgenie.rewards.visual_reward.high_level_matching_score import high_level_matching_score
+from webgenie.rewards.visual_reward.low_level_matching_score import low_level_matching_score
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+CAPTURE_MODES = ["playwright", "cdp"]
+
+
+async def score_solutions(original_path, solution_paths, capture_mode):
+    start_time = time.time()
+    original_artifact = await render_html_artifact(original_path, capture_mode)
+    artifacts = [await render_html_artifact(path, capture_mode) for path in solution_paths]
+    render_time = time.time() - start_time
+
+    scores = high_level_matching_score(artifacts, original_artifact) * 0.3 \
+        + np.array(low_level_matching_score(artifacts, original_artifact)) * 0.7
+    total_time = time.time() - start_time
+    return original_artifact, scores, render_time, total_time
+
+
+async def benchmark(original_path, solution_paths, repeats):
+    await start_browser()
+    # Warm up the pooled browser and CLIP before timing anything
+    await score_solutions(original_path, solution_paths[:1], CAPTURE_MODES[0])
+
+    results = {}
+    for capture_mode in CAPTURE_MODES:
+        render_times, total_times = [], []
+        for _ in range(repeats):
+            original_artifact, scores, render_time, total_time = await score_solutions(
+                original_path, solution_paths, capture_mode,
+            )
+            render_times.append(render_time / (len(solution_paths) + 1))
+            total_times.append(total_time / len(solution_paths))
+        results[capture_mode] = scores
+        print(
+            f"{capture_mode:>10} | {original_artifact.screenshot.width}x{original_artifact.screenshot.height}"
+            f" | render {np.median(render_times) * 1000:8.1f} ms per page"
+            f" | scoring {np.median(total_times) * 1000:8.1f} ms per solution"
+            f" | scores {np.round(scores, 4)}"
+        )
+    print(f"max score difference {np.abs(results['playwright'] - results['cdp']).max():.6f}")
+    await stop_browser()
+
+
+if __name__ == "__main__":
+    # Usage: benchmark_screenshot_capture.py [original.html [solution.html ...]]
+    paths = sys.argv[1:] or [os.path.join(DATA_DIR, name) for name in ["test.html", "test_p.html", "test_p_1.html"]]
+    original_path, solution_paths = paths[0], paths[1:] or paths[:1]
+    asyncio.run(benchmark(original_path, solution_paths, repeats=5))
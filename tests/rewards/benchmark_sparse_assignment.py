@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+import numpy as np
+from dotenv import load_dotenv, find_dotenv
+def init_test():
+    parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(parent_dir)
+    load_dotenv(find_dotenv(filename=".env.validator"))
+
+init_test()
+
+
+from webgenie.rewards.visual_reward.common.assignment import match_elements
+from webgenie.rewards.visual_reward.common.element_table import ElementTable
+from webgenie.rewards.visual_reward.common.extract_html_elements import HTMLElement
+from webgenie.rewards.visual_reward.low_level_matching_score import element_matching_score
+
+WORDS = ["Home", "About us", "Contact", "Pricing", "Get started", "Sign in", "Learn more", "Features", "Blog", "Careers"]
+
+
+def page_elements(count, rng):
+    elements = []
+    for _ in range(count):
+        descriptors = None
+        if rng.random() < 0.5:
+            descriptors = rng.integers(0, 256, size=(rng.integers(1, 16), 128)).astype(np.uint8)
+        elements.append(
+            HTMLElement(
+                text=" ".join(rng.choice(WORDS, size=rng.integers(1, 4))) + f" {rng.integers(0, count)}",
+                scaled_bounding_box={
+                    "x": rng.random(),
+                    "y": rng.random(),
+                    "width": rng.random() / 10,
+                    "height": rng.random() / 50,
+                },
+                color=tuple(int(v) for v in rng.integers(0, 256, size=3)),
+                keypoints=descriptors,
+                descriptors=descriptors,
+                avg_color=tuple(int(v) for v in rng.integers(0, 256, size=3)),
+            )
+        )
+    return elements
+
+
+def predicted_page(original_elements, rng):
+    # A close reproduction: elements nudged around, some texts and colors changed, a few dropped
+    predicted_elements = []
+    for element in original_elements:
+        if rng.random() < 0.05:
+            continue
+        element = element.model_copy(deep=True)
+        box = element.scaled_bounding_box
+        box["x"] += rng.normal(0, 0.01)
+        box["y"] += rng.normal(0, 0.01)
+        if rng.random() < 0.2:
+            element.text = element.text[::-1]
+        if rng.random() < 0.2:
+            element.avg_color = tuple(int(v) for v in rng.integers(0, 256, size=3))
+        predicted_elements.append(element)
+    return predicted_elements
+
+
+def element_matching_score_with(predicted_elements, original_elements, sparse):
+    _, _, costs = match_elements(
+        ElementTable.from_elements(predicted_elements),
+        ElementTable.from_elements(original_elements),
+        element_matching_score.create_cost_matrix,
+        element_matching_score.create_cost_pairs,
+        sparse=sparse,
+    )
+    return -costs.sum() / max(len(predicted_elements), len(original_elements))
+
+
+def benchmark(count, rng):
+    original_elements = page_elements(count, rng)
+    predicted_elements = predicted_page(original_elements, rng)
+    results = {}
+    for sparse in [False, True]:
+        start = time.time()
+        score = element_matching_score_with(predicted_elements, original_elements, sparse)
+        results[sparse] = (score, time.time() - start)
+    (dense_score, dense_time), (sparse_score, sparse_time) = results[False], results[True]
+    print(
+        f"{count:>5} elements | dense {dense_score:.4f} in {dense_time:7.2f}s"
+        f" | sparse {sparse_score:.4f} in {sparse_time:7.2f}s"
+        f" | score difference {abs(dense_score - sparse_score):.4f}"
+    )
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    counts = [int(count) for count in sys.argv[1:]] or [100, 1000, 5000]
+    for count in counts:
+        benchmark(count, rng)
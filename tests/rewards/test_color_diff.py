@@ -0,0 +1,71 @@
+import sys
+import os
+import numpy as np
+from dotenv import load_dotenv, find_dotenv
+def init_test():
+    parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(parent_dir)
+    load_dotenv(find_dotenv(filename=".env.validator"))
+
+init_test()
+
+
+from colormath.color_objects import sRGBColor, LabColor
+from colormath.color_conversions import convert_color
+
+from webgenie.rewards.visual_reward.common.color_diff import (
+    color_similarity_ciede2000,
+    color_similarity_matrix_ciede2000,
+    rgb_to_lab,
+)
+
+
+def reference_color_similarity(rgb1, rgb2):
+    lab1 = convert_color(sRGBColor(*rgb1, is_upscaled=True), LabColor)
+    lab2 = convert_color(sRGBColor(*rgb2, is_upscaled=True), LabColor)
+    L1, a1, b1 = lab1.lab_l, lab1.lab_a, lab1.lab_b
+    L2, a2, b2 = lab2.lab_l, lab2.lab_a, lab2.lab_b
+    C1 = np.sqrt(a1**2 + b1**2)
+    C2 = np.sqrt(a2**2 + b2**2)
+    delta_C = C1 - C2
+    h1 = np.arctan2(b1, a1)
+    h2 = np.arctan2(b2, a2)
+    delta_H = h1 - h2
+    if delta_H < 0:
+        delta_H += 2 * np.pi
+    if delta_H > np.pi:
+        delta_H -= 2 * np.pi
+    delta_H_star = 2 * np.sqrt(C1 * C2) * np.sin(delta_H / 2)
+    delta_theta = h1 - h2 + np.radians(30)
+    R_T = -0.17 * np.cos(delta_theta) + 0.24 * np.cos(2 * h1 + np.radians(60)) \
+          - 0.32 * np.cos(3 * h1 + np.radians(120)) + 0.2 * np.cos(4 * h1 - np.radians(63))
+    with np.errstate(invalid="ignore"):
+        delta_e = np.sqrt((L1 - L2)**2 + delta_C**2 + delta_H_star**2 + R_T * delta_C * delta_H_star)
+    return max(0, 1 - (delta_e / 100))
+
+
+def test_rgb_to_lab_matches_colormath():
+    rng = np.random.default_rng(0)
+    colors = np.vstack([rng.integers(0, 256, size=(200, 3)), rng.random((50, 3)) * 255, [[0, 0, 0], [255, 255, 255]]])
+    lab = rgb_to_lab(colors)
+    for color, converted in zip(colors, lab):
+        expected = convert_color(sRGBColor(*color, is_upscaled=True), LabColor)
+        assert np.allclose(converted, (expected.lab_l, expected.lab_a, expected.lab_b), atol=1e-9)
+
+
+def test_color_similarity_matches_reference():
+    rng = np.random.default_rng(1)
+    colors1 = np.vstack([rng.integers(0, 256, size=(40, 3)), [[0, 0, 0], [255, 255, 255], [128, 128, 128]]])
+    colors2 = np.vstack([rng.integers(0, 256, size=(30, 3)), [[0, 0, 0], [255, 255, 255], [0, 0, 255]]])
+    similarity = color_similarity_matrix_ciede2000(colors1, colors2)
+    assert similarity.shape == (len(colors1), len(colors2))
+    for i, color1 in enumerate(colors1):
+        for j, color2 in enumerate(colors2):
+            expected = reference_color_similarity(color1, color2)
+            assert np.isclose(similarity[i, j], expected)
+            assert np.isclose(color_similarity_ciede2000(color1, color2), expected)
+
+
+if __name__ == "__main__":
+    test_rgb_to_lab_matches_colormath()
+    test_color_similarity_matches_reference()
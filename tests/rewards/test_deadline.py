@@ -0,0 +1,71 @@
+import asyncio
+import sys
+import os
+import tempfile
+import time
+from unittest.mock import AsyncMock, patch
+from dotenv import load_dotenv, find_dotenv
+def init_test():
+    parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(parent_dir)
+    load_dotenv(find_dotenv(filename=".env.validator"))
+
+init_test()
+
+
+import webgenie.rewards.visual_reward.visual_reward as visual_reward
+from webgenie.rewards.visual_reward.common.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    deadline_scope,
+)
+from webgenie.tasks import ImageTask, Solution
+
+
+def score_with_fallback():
+    # Like the scorers: any error scores 0, but a deadline must still get through
+    try:
+        while True:
+            check_deadline()
+            time.sleep(0.01)
+    except Exception:
+        return 0
+
+
+async def score_stage():
+    with deadline_scope("matching", 0.05):
+        return score_with_fallback()
+
+
+def test_deadline_stops_scoring_loop():
+    check_deadline()
+    stage = None
+    try:
+        asyncio.run(asyncio.wait_for(score_stage(), timeout=5))
+    except DeadlineExceeded as e:
+        stage = e.stage
+    assert stage == "matching"
+    # Leaving the scope removes the deadline
+    check_deadline()
+
+
+def test_timeouts_are_counted_by_the_reward():
+    reward = visual_reward.VisualReward()
+    task = ImageTask(task_id="task", ground_truth_html="<p>hello</p>")
+    solutions = [Solution(html=f"<p>{uid}</p>", miner_uid=uid) for uid in range(4)]
+    # What the workers send back: the score and the stage whose deadline was exceeded
+    results = [(0, "render"), (0.5, None), (0, "matching"), RuntimeError("worker died")]
+
+    with tempfile.TemporaryDirectory() as work_dir, \
+            patch.object(visual_reward, "WORK_DIR", work_dir), \
+            patch.object(visual_reward.scoring_worker_pool, "run_each", AsyncMock(return_value=results)):
+        scores = asyncio.run(reward.reward(task, solutions))
+        asyncio.run(reward.reward(task, solutions[:1]))
+
+    assert list(scores) == [0, 0.5, 0, 0]
+    assert reward.get_timeout_counts() == {"render": {0: 2}, "matching": {2: 1}}
+
+
+if __name__ == "__main__":
+    test_deadline_stops_scoring_loop()
+    test_timeouts_are_counted_by_the_reward()
@@ -0,0 +1,97 @@
+import sys
+import os
+import pickle
+import tempfile
+import time
+import numpy as np
+from concurrent.futures import Future
+from unittest.mock import patch
+from dotenv import load_dotenv, find_dotenv
+def init_test():
+    parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(parent_dir)
+    load_dotenv(find_dotenv(filename=".env.validator"))
+
+init_test()
+
+
+import webgenie.rewards.visual_reward.ground_truth as ground_truth
+from webgenie.rewards.visual_reward.common.element_table import ElementTable
+from webgenie.rewards.visual_reward.common.extract_html_elements import HTMLElement
+from webgenie.rewards.visual_reward.common.render_artifact import RenderArtifact
+
+
+def make_element(count):
+    rng = np.random.default_rng(count)
+    return HTMLElement(
+        text=f"element {count}",
+        scaled_bounding_box={"x": 0.1, "y": 0.2, "width": 0.5, "height": 0.25},
+        keypoints=rng.integers(0, 10, size=(count, 2)),
+        descriptors=rng.integers(0, 255, size=(count, 128), dtype=np.uint8),
+    )
+
+
+def test_published_features_round_trip():
+    elements = [make_element(3), make_element(0), make_element(5)]
+    artifact = RenderArtifact(
+        html_path="original.html",
+        text_elements=ElementTable.from_elements([HTMLElement(text="hello")]),
+        button_elements=ElementTable.from_elements(elements),
+        clip_embedding=np.linspace(0, 1, 512, dtype=np.float32),
+        histogram=np.full(256, 1 / 256),
+    )
+
+    with tempfile.TemporaryDirectory() as features_dir, \
+            patch.object(ground_truth, "GROUND_TRUTH_FEATURES_DIR", features_dir):
+        features = ground_truth.publish_ground_truth_features(artifact, "digest")
+        # The handle is all that gets pickled per solution
+        assert len(pickle.dumps(features)) < 1000
+
+        attached = ground_truth.attach_ground_truth_features(features)
+        assert isinstance(attached.clip_embedding, np.memmap)
+        assert np.array_equal(attached.clip_embedding, artifact.clip_embedding)
+        assert np.array_equal(attached.histogram, artifact.histogram)
+        assert attached.text_elements.texts == ["hello"]
+        buttons = attached.button_elements
+        assert isinstance(buttons.descriptors, np.memmap)
+        assert buttons.texts == [element.text for element in elements]
+        assert np.array_equal(buttons.scaled_boxes, artifact.button_elements.scaled_boxes)
+        for i, element in enumerate(elements):
+            begin, end = buttons.descriptor_offsets[i], buttons.descriptor_offsets[i + 1]
+            assert np.array_equal(buttons.keypoints[begin:end], element.keypoints)
+            assert np.array_equal(buttons.descriptors[begin:end], element.descriptors)
+
+        ground_truth.release_ground_truth_features(features)
+        assert not os.path.exists(features.path)
+
+
+def test_dropped_features_are_released():
+    artifact = RenderArtifact(html_path="original.html")
+    with tempfile.TemporaryDirectory() as features_dir, \
+            patch.object(ground_truth, "GROUND_TRUTH_FEATURES_DIR", features_dir):
+        # A build that has not started is cancelled
+        pending = Future()
+        ground_truth.discard_ground_truth_features(pending)
+        assert pending.cancelled()
+
+        # A build in progress is released once it finishes
+        running = Future()
+        running.set_running_or_notify_cancel()
+        ground_truth.discard_ground_truth_features(running)
+        features = ground_truth.publish_ground_truth_features(artifact, "running")
+        running.set_result(features)
+        assert not os.path.exists(features.path)
+
+        # Features nobody released are swept once they are stale
+        fresh = ground_truth.publish_ground_truth_features(artifact, "fresh")
+        stale = ground_truth.publish_ground_truth_features(artifact, "stale")
+        an_hour_ago = time.time() - 3600
+        os.utime(stale.path, (an_hour_ago, an_hour_ago))
+        ground_truth.sweep_ground_truth_features(max_age=600)
+        assert os.path.exists(fresh.path)
+        assert not os.path.exists(stale.path)
+
+
+if __name__ == "__main__":
+    test_published_features_round_trip()
+    test_dropped_features_are_released()
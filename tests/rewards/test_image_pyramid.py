@@ -0,0 +1,65 @@
+import sys
+import os
+import numpy as np
+from unittest.mock import patch
+from dotenv import load_dotenv, find_dotenv
+def init_test():
+    parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(parent_dir)
+    load_dotenv(find_dotenv(filename=".env.validator"))
+
+init_test()
+
+
+import webgenie.rewards.visual_reward.high_level_matching_score.clip_matching_score as clip_matching_score
+import webgenie.rewards.visual_reward.high_level_matching_score.histogram as histogram
+from webgenie.rewards.visual_reward.common.render_artifact import RenderArtifact
+from webgenie.rewards.visual_reward.common.screenshot import Screenshot
+from webgenie.rewards.visual_reward.high_level_matching_score.high_level_matching_score import high_level_matching_score
+
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "image_techcompany.jpg")
+
+
+def artifact(rgb):
+    screenshot = Screenshot(np.ascontiguousarray(rgb))
+    return RenderArtifact(screenshot=screenshot, inpainted_screenshot=screenshot)
+
+
+def tall_page(rgb, height=8000):
+    # A long landing page made of the image and its mirrors
+    sections = [rgb, rgb[::-1], rgb[:, ::-1]]
+    return np.concatenate(sections * (height // (3 * len(rgb)) + 1))[:height]
+
+
+def high_level_scores(predict_artifacts, original_artifact, full_resolution=False):
+    if not full_resolution:
+        return high_level_matching_score(predict_artifacts, original_artifact)
+    with patch.object(clip_matching_score, "CLIP_PYRAMID_MIN_SIZE", sys.maxsize), \
+            patch.object(histogram, "HISTOGRAM_PYRAMID_MIN_SIZE", sys.maxsize):
+        return high_level_matching_score(predict_artifacts, original_artifact)
+
+
+def test_reduced_levels_bound_score_drift():
+    rgb = Screenshot.from_file(IMAGE_PATH).rgb[:, :1280]
+    rng = np.random.default_rng(0)
+    for original_rgb in [rgb, tall_page(rgb)]:
+        shifted = np.roll(original_rgb, 40, axis=0)
+        recolored = original_rgb.copy()
+        recolored[: len(recolored) // 3] = 255 - recolored[: len(recolored) // 3]
+        noisy = np.clip(original_rgb + rng.normal(0, 20, original_rgb.shape), 0, 255).astype(np.uint8)
+        predict_artifacts = [artifact(shifted), artifact(recolored), artifact(noisy), artifact(original_rgb[::-1])]
+
+        original_artifact = artifact(original_rgb)
+        scores = high_level_scores(predict_artifacts, original_artifact)
+        full_resolution_scores = high_level_scores(predict_artifacts, original_artifact, full_resolution=True)
+        assert np.abs(scores - full_resolution_scores).max() < 0.01
+
+    # Levels are made once and not sent along with the screenshot
+    screenshot = original_artifact.screenshot
+    assert screenshot.reduced(448) is screenshot.reduced(448)
+    assert screenshot.reduced(448).height < screenshot.height // 10
+    assert screenshot.__getstate__().keys() == {"rgb"}
+
+
+if __name__ == "__main__":
+    test_reduced_levels_bound_score_drift()
@@ -0,0 +1,80 @@
+import sys
+import os
+import numpy as np
+from dotenv import load_dotenv, find_dotenv
+def init_test():
+    parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(parent_dir)
+    load_dotenv(find_dotenv(filename=".env.validator"))
+
+init_test()
+
+
+from webgenie.rewards.visual_reward.common.sift import (
+    batch_match_sift_features,
+    detect_sift_features,
+    extract_sift_from_roi,
+    extract_sift_from_rois,
+    match_sift_features,
+)
+
+
+def textured_page(rng, height=600, width=400):
+    return np.kron(rng.random((height // 8, width // 8)), np.ones((8, 8))).astype(np.float32)
+
+
+def sorted_features(keypoints, descriptors):
+    order = np.lexsort((keypoints[:, 1], keypoints[:, 0]))
+    return keypoints[order], descriptors[order]
+
+
+def test_rois_match_per_roi_extraction():
+    rng = np.random.default_rng(0)
+    gray_image = textured_page(rng)
+    rois = [(16, 16, 120, 64), (200, 40, 96, 96), (40, 300, 300, 120), (360, 560, 40, 40)]
+
+    features = extract_sift_from_rois(gray_image, rois, context=0, max_keypoints=10**6)
+    for roi, (keypoints, descriptors) in zip(rois, features):
+        try:
+            expected_keypoints, expected_descriptors = extract_sift_from_roi(gray_image, roi)
+        except Exception:
+            expected_keypoints, expected_descriptors = np.zeros((0, 2)), np.zeros((0, 128))
+        keypoints, descriptors = sorted_features(keypoints, descriptors)
+        expected_keypoints, expected_descriptors = sorted_features(expected_keypoints, expected_descriptors)
+        assert np.array_equal(keypoints, expected_keypoints)
+        assert np.array_equal(descriptors, expected_descriptors)
+
+    capped = extract_sift_from_rois(gray_image, rois, context=0, max_keypoints=5)
+    assert all(len(keypoints) == min(5, len(full[0])) for (keypoints, _), full in zip(capped, features))
+
+
+def test_tiles_match_whole_page_detection():
+    rng = np.random.default_rng(1)
+    gray_image = textured_page(rng, height=1200)
+    keypoints, _, _ = detect_sift_features(gray_image, tile_height=400, tile_overlap=64)
+    whole_keypoints, _, _ = detect_sift_features(gray_image, tile_height=10**6)
+    assert keypoints[:, 0].min() >= 0 and keypoints[:, 0].max() < gray_image.shape[0]
+    # Away from the seams the tiles see the same neighbourhood as the whole page
+    assert abs(len(keypoints) - len(whole_keypoints)) < 0.1 * len(whole_keypoints)
+
+
+def test_batch_matching_matches_pairwise_assignment():
+    rng = np.random.default_rng(2)
+    predicted = [None if rng.random() < 0.2 else rng.random((rng.integers(0, 6), 4)) for _ in range(15)]
+    original = [None if rng.random() < 0.2 else rng.random((rng.integers(0, 6), 4)) for _ in range(12)]
+    mask = rng.random((15, 12)) < 0.7
+
+    similarity = batch_match_sift_features(predicted, original, mask=mask, mode="assignment")
+    for mode in ["mutual_nn", "ratio"]:
+        approximate = batch_match_sift_features(predicted, original, mask=mask, mode=mode)
+        assert np.all((approximate >= 0) & (approximate <= 1))
+    for i, desc1 in enumerate(predicted):
+        for j, desc2 in enumerate(original):
+            expected = match_sift_features(desc1, desc1, desc2, desc2) if mask[i, j] else 0
+            assert np.isclose(similarity[i, j], expected)
+
+
+if __name__ == "__main__":
+    test_rois_match_per_roi_extraction()
+    test_tiles_match_whole_page_detection()
+    test_batch_matching_matches_pairwise_assignment()
@@ -0,0 +1,230 @@
+import sys
+import os
+import random
+import numpy as np
+from dotenv import load_dotenv, find_dotenv
+def init_test():
+    parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.append(parent_dir)
+    load_dotenv(find_dotenv(filename=".env.validator"))
+
+init_test()
+
+
+from scipy.optimize import linear_sum_assignment
+
+from webgenie.constants import SPARSE_ASSIGNMENT_MIN_ELEMENTS, SPARSE_ASSIGNMENT_MAX_DISPLACEMENT
+from webgenie.rewards.visual_reward.common.assignment import candidate_pairs, match_elements, sparse_assignment
+from webgenie.rewards.visual_reward.common.element_table import ElementTable
+from webgenie.rewards.visual_reward.common.extract_html_elements import HTMLElement
+from webgenie.rewards.visual_reward.common.similarity import (
+    calculate_text_similarity,
+    calculate_block_similarity,
+    calculate_color_similarity,
+    calculate_visual_similarity,
+)
+from webgenie.rewards.visual_reward.common.similarity_matrix import (
+    block_similarity_matrix,
+    color_similarity_matrix,
+    text_similarity_matrix,
+    visual_similarity_matrix,
+)
+from webgenie.rewards.visual_reward.common.text_similarity import text_similarity_matrix as text_list_similarity_matrix
+from webgenie.rewards.visual_reward.low_level_matching_score.element_matching_score import calculate_element_matching_similarity
+from webgenie.rewards.visual_reward.low_level_matching_score.text_matching_score import calculate_text_matching_similarity
+
+WORDS = ["Home", "About us", "Contact", "Pricing", "Get started", "Sign in", "", "Learn more", "Features"]
+COLORS = [(0, 0, 0), (255, 255, 255), (23, 34, 45), (200, 10, 10), (12, 120, 250)]
+
+
+def random_elements(count, rng):
+    elements = []
+    for _ in range(count):
+        descriptors = None
+        if rng.random() < 0.7:
+            # Integer descriptors without repeats within an element, like SIFT's uint8 ones
+            descriptors = np.unique(rng.integers(0, 2, size=(rng.integers(1, 6), 6)), axis=0).astype(np.float64)
+        elements.append(
+            HTMLElement(
+                text=" ".join(random.choice(WORDS) for _ in range(rng.integers(1, 3))).strip(),
+                bounding_box={},
+                # Element tables hold float32 boxes, so ties are broken alike on both sides
+                scaled_bounding_box={
+                    "x": float(np.float32(rng.random())),
+                    "y": float(np.float32(rng.random())),
+                    "width": float(np.float32(rng.random() / 4)),
+                    "height": float(np.float32(rng.random() / 10)),
+                },
+                color=random.choice(COLORS),
+                keypoints=descriptors,
+                descriptors=descriptors,
+                avg_color=tuple(int(v) for v in rng.integers(0, 256, size=3)),
+            )
+        )
+    return elements
+
+
+def reference_element_matching_similarity(predicted_elements, original_elements):
+    def calculate_cost(predicted_element, original_element):
+        text_similarity = calculate_text_similarity(predicted_element, original_element)
+        visual_similarity = calculate_visual_similarity(predicted_element, original_element)
+        block_similarity = calculate_block_similarity(predicted_element, original_element)
+        return text_similarity * 0.5 + visual_similarity * 0.3 + block_similarity * 0.2
+
+    cost_matrix = np.zeros((len(predicted_elements), len(original_elements)))
+    for i, predicted_element in enumerate(predicted_elements):
+        for j, original_element in enumerate(original_elements):
+            cost_matrix[i][j] = -calculate_cost(predicted_element, original_element)
+    row_ind, col_ind = linear_sum_assignment(cost_matrix)
+    similarity_sum = sum(calculate_cost(predicted_elements[i], original_elements[j]) for i, j in zip(row_ind, col_ind))
+    total_count = max(len(predicted_elements), len(original_elements))
+    return 1 if total_count == 0 else similarity_sum / total_count
+
+
+def reference_text_matching_similarity(predicted_elements, original_elements):
+    cost_matrix = np.zeros((len(predicted_elements), len(original_elements)))
+    for i, predicted_element in enumerate(predicted_elements):
+        for j, original_element in enumerate(original_elements):
+            cost_matrix[i][j] = -(
+                calculate_text_similarity(predicted_element, original_element) * 0.8
+                + calculate_block_similarity(predicted_element, original_element) * 0.2
+            )
+    row_ind, col_ind = linear_sum_assignment(cost_matrix)
+    match_count, text_sum, block_sum, color_sum = 0, 0, 0, 0
+    for i, j in zip(row_ind, col_ind):
+        text_similarity = calculate_text_similarity(predicted_elements[i], original_elements[j])
+        if text_similarity < 0.5:
+            continue
+        match_count += 1
+        text_sum += text_similarity
+        block_sum += calculate_block_similarity(predicted_elements[i], original_elements[j])
+        color_sum += calculate_color_similarity(predicted_elements[i], original_elements[j])
+    total_count = len(predicted_elements) + len(original_elements) - match_count
+    if total_count == 0:
+        return 1
+    return (text_sum * 0.5 + block_sum * 0.3 + color_sum * 0.2) / total_count
+
+
+def test_similarity_matrices_match_pairwise_functions():
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    predicted_elements = random_elements(12, rng)
+    original_elements = random_elements(9, rng)
+    predicted_table = ElementTable.from_elements(predicted_elements)
+    original_table = ElementTable.from_elements(original_elements)
+
+    block_similarity = block_similarity_matrix(predicted_table, original_table)
+    text_similarity = text_similarity_matrix(predicted_table, original_table)
+    color_similarity = color_similarity_matrix(predicted_table.colors, original_table.colors)
+    visual_similarity = visual_similarity_matrix(predicted_table, original_table)
+
+    for i, predicted_element in enumerate(predicted_elements):
+        for j, original_element in enumerate(original_elements):
+            assert np.isclose(block_similarity[i, j], calculate_block_similarity(predicted_element, original_element))
+            assert np.isclose(text_similarity[i, j], calculate_text_similarity(predicted_element, original_element))
+            assert np.isclose(color_similarity[i, j], calculate_color_similarity(predicted_element, original_element))
+            assert np.isclose(visual_similarity[i, j], calculate_visual_similarity(predicted_element, original_element))
+
+
+def test_text_similarity_matrix_mask_and_threshold():
+    random.seed(2)
+    predicted_texts = [" ".join(random.choice(WORDS) for _ in range(random.randint(0, 3))) for _ in range(30)]
+    original_texts = [" ".join(random.choice(WORDS) for _ in range(random.randint(0, 3))) for _ in range(20)]
+    mask = np.random.default_rng(2).random((30, 20)) < 0.5
+
+    exact = text_list_similarity_matrix(predicted_texts, original_texts)
+    masked = text_list_similarity_matrix(predicted_texts, original_texts, mask=mask)
+    bounded = text_list_similarity_matrix(predicted_texts, original_texts, threshold=0.5)
+
+    assert np.allclose(masked, np.where(mask, exact, 0))
+    # Pairs ruled out by the bounds drop to 0, everything that reaches the threshold is exact
+    assert np.allclose(np.where(exact >= 0.5, bounded, 0), np.where(exact >= 0.5, exact, 0))
+    assert np.all((bounded == 0) | np.isclose(bounded, exact))
+
+
+def test_matching_scores_match_reference():
+    random.seed(1)
+    rng = np.random.default_rng(1)
+    for n, m in [(0, 0), (0, 5), (7, 0), (10, 10), (25, 18)]:
+        predicted_elements = random_elements(n, rng)
+        original_elements = random_elements(m, rng)
+        predicted_table = ElementTable.from_elements(predicted_elements)
+        original_table = ElementTable.from_elements(original_elements)
+        assert np.isclose(
+            calculate_element_matching_similarity(predicted_table, original_table),
+            reference_element_matching_similarity(predicted_elements, original_elements),
+        )
+        assert np.isclose(
+            calculate_text_matching_similarity(predicted_table, original_table),
+            reference_text_matching_similarity(predicted_elements, original_elements),
+        )
+
+
+def test_sparse_assignment_matches_dense():
+    rng = np.random.default_rng(3)
+    for n, m in [(1, 1), (8, 5), (6, 11), (30, 30)]:
+        similarity = rng.random((n, m))
+        rows, cols = np.nonzero(np.ones((n, m), dtype=bool))
+        matched = sparse_assignment(rows, cols, -similarity[rows, cols], n, m)
+        row_ind, col_ind = linear_sum_assignment(-similarity)
+        assert np.isclose(similarity[rows[matched], cols[matched]].sum(), similarity[row_ind, col_ind].sum())
+        assert len(set(rows[matched])) == len(matched) and len(set(cols[matched])) == len(matched)
+
+    boxes = rng.random((200, 4))
+    rows, cols = candidate_pairs(boxes[:120], boxes[80:], 0.1)
+    shift = np.abs(boxes[:120, None, :2] - boxes[None, 80:, :2]).max(axis=2)
+    assert set(zip(rows, cols)) == set(zip(*np.nonzero(shift <= 0.1)))
+
+
+def corner_shift(predicted_boxes, original_boxes):
+    return np.abs(predicted_boxes[:, None, :2] - original_boxes[None, :, :2]).max(axis=2)
+
+
+def position_cost_matrix(predicted_elements, original_elements):
+    shift = corner_shift(predicted_elements.scaled_boxes, original_elements.scaled_boxes)
+    return -np.clip(1 - 2 * shift, 0, 1)
+
+
+def position_cost_pairs(predicted_elements, original_elements, rows, cols):
+    return position_cost_matrix(predicted_elements, original_elements)[rows, cols]
+
+
+def test_dense_and_sparse_scores_at_threshold():
+    rng = np.random.default_rng(4)
+    count = SPARSE_ASSIGNMENT_MIN_ELEMENTS
+    original_boxes = rng.random((count, 4)).astype(np.float32)
+    predicted_boxes = original_boxes + rng.normal(0, 0.01, size=(count, 4)).astype(np.float32)
+    # A few elements moved further than the sparse path looks
+    moved = rng.choice(count, size=count // 50, replace=False)
+    predicted_boxes[moved, 1] += 1.5 * SPARSE_ASSIGNMENT_MAX_DISPLACEMENT
+    predicted_table = ElementTable(boxes=predicted_boxes)
+    original_table = ElementTable(boxes=original_boxes)
+
+    def similarity_sum(sparse):
+        rows, cols, costs = match_elements(
+            predicted_table, original_table, position_cost_matrix, position_cost_pairs, sparse=sparse,
+        )
+        return -costs.sum(), rows, cols
+
+    # At the threshold the sparse path is taken
+    sparse_sum, sparse_rows, sparse_cols = similarity_sum(None)
+    assert np.isclose(sparse_sum, similarity_sum(True)[0])
+    dense_sum, dense_rows, dense_cols = similarity_sum(False)
+
+    shift = corner_shift(predicted_table.scaled_boxes, original_table.scaled_boxes)
+    assert np.all(shift[sparse_rows, sparse_cols] <= SPARSE_ASSIGNMENT_MAX_DISPLACEMENT)
+    # The scores only differ by the far pairs the dense path matched
+    far = shift[dense_rows, dense_cols] > SPARSE_ASSIGNMENT_MAX_DISPLACEMENT
+    far_similarity = -position_cost_matrix(predicted_table, original_table)[dense_rows[far], dense_cols[far]].sum()
+    assert far_similarity > 0
+    assert sparse_sum <= dense_sum + 1e-6
+    assert dense_sum - sparse_sum <= far_similarity + 1e-6
+    assert (dense_sum - sparse_sum) / count < 0.01
+
+
+if __name__ == "__main__":
+    test_similarity_matrices_match_pairwise_functions()
+    test_text_similarity_matrix_mask_and_threshold()
+    test_matching_scores_match_reference()
+    test_sparse_assignment_matches_dense()
+    test_dense_and_sparse_scores_at_threshold()
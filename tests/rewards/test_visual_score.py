@@ -13,6 +13,7 @@ init_test()
 
 from webgenie.rewards.visual_reward.common.browser import start_browser, stop_browser
 from webgenie.rewards.visual_reward.common.extract_html_elements import extract_html_elements
+from webgenie.rewards.visual_reward.common.render_artifact import render_html_artifact
 from webgenie.rewards.visual_reward.low_level_matching_score.text_matching_score import calculate_text_matching_similarity
 from webgenie.rewards.visual_reward.low_level_matching_score.input_matching_score import calculate_input_matching_similarity
 from webgenie.rewards.visual_reward.low_level_matching_score.element_matching_score import calculate_element_matching_similarity
@@ -26,7 +27,9 @@ async def test_text_matching_score():
     start_time = time.time()
     url = "test1.html"
     url_predict = "miner.html"
-    scores = await high_level_matching_score([url_predict], url)
+    original_artifact = await render_html_artifact(url)
+    predict_artifact = await render_html_artifact(url_predict)
+    scores = high_level_matching_score([predict_artifact], original_artifact)
     print(scores)
     print(time.time() - start_time)
     await stop_browser()
@@ -0,0 +1,80 @@
+from init_test import init_test
+init_test()
+
+import asyncio
+import tempfile
+from unittest.mock import patch
+
+import webgenie.helpers.assets as assets
+from webgenie.constants import PLACE_HOLDER_IMAGE_URL
+
+TAILWIND_URL = "https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css"
+
+
+class FakeRequest:
+    def __init__(self, url):
+        self.url = url
+
+
+class FakeResponse:
+    ok = True
+    status = 200
+
+    def __init__(self, body):
+        self._body = body
+
+    async def body(self):
+        return self._body
+
+
+class FakeRoute:
+    def __init__(self, url, body=None):
+        self.request = FakeRequest(url)
+        self.outcome = None
+        self._body = body
+
+    async def continue_(self):
+        self.outcome = ("continue",)
+
+    async def abort(self, error_code=None):
+        self.outcome = ("abort", error_code)
+
+    async def fulfill(self, status=None, body=None, content_type=None, headers=None):
+        self.outcome = ("fulfill", body, content_type)
+
+    async def fetch(self):
+        if self._body is None:
+            raise ConnectionError("offline")
+        return FakeResponse(self._body)
+
+
+def route(url, body=None):
+    fake_route = FakeRoute(url, body)
+    asyncio.run(assets.route_assets(fake_route))
+    return fake_route.outcome
+
+
+def test_route_assets_serves_cache_and_blocks_the_rest():
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            patch.object(assets, "ASSET_CACHE_DIR", cache_dir), \
+            patch.object(assets, "_assets", {}):
+        assert route("file:///tmp/page.html") == ("continue",)
+        assert route("https://example.com/script.js") == ("abort", "blockedbyclient")
+
+        # An allowed asset that is neither cached nor reachable fails instead of hanging
+        assert route(TAILWIND_URL) == ("abort", "blockedbyclient")
+        assets.write_asset(TAILWIND_URL, b"body{}")
+        assert route(TAILWIND_URL) == ("fulfill", b"body{}", "text/css")
+
+        # The gray stand-in is served offline but never cached in place of the real image
+        outcome = route(PLACE_HOLDER_IMAGE_URL)
+        assert outcome[0] == "fulfill" and outcome[2] == "image/jpeg"
+        assert assets.read_asset(PLACE_HOLDER_IMAGE_URL) is None
+
+        assets._assets.clear()
+        assert route(PLACE_HOLDER_IMAGE_URL, b"picsum") == ("fulfill", b"picsum", "image/jpeg")
+        assert assets.read_asset(PLACE_HOLDER_IMAGE_URL) == b"picsum"
+
+
+if __name__ == "__main__":
+    test_route_assets_serves_cache_and_blocks_the_rest()
@@ -0,0 +1,101 @@
+from init_test import init_test
+init_test()
+
+import asyncio
+import time
+import numpy as np
+from typing import List
+
+from webgenie.rewards import Reward
+from webgenie.tasks import Task, Solution
+from webgenie.tasks.metric_executor import MetricExecutor
+from webgenie.tasks.task_generator import TaskGenerator
+
+
+class FixedReward(Reward):
+    def __init__(self, scores: dict[str, float]):
+        self.scores = scores
+        self.scored_htmls = []
+
+    async def reward(self, task: Task, solutions: List[Solution]) -> np.ndarray:
+        self.scored_htmls.extend(solution.html for solution in solutions)
+        return np.array([self.scores[solution.html] for solution in solutions])
+
+
+def slow_metric(value, seconds):
+    async def calculate():
+        await asyncio.sleep(seconds)
+        return np.array([value])
+    return calculate
+
+
+def test_metrics_run_concurrently_and_are_timed():
+    executor = MetricExecutor(max_concurrency=2)
+    metrics = {
+        "a": slow_metric(1, 0.2),
+        "b": slow_metric(2, 0.2),
+        "c": slow_metric(3, 0.2),
+    }
+
+    start_time = time.monotonic()
+    scores = asyncio.run(executor.run(metrics))
+    elapsed = time.monotonic() - start_time
+
+    assert list(scores) == ["a", "b", "c"]
+    assert [scores[name][0] for name in scores] == [1, 2, 3]
+    # Two at a time: two rounds instead of three
+    assert 0.4 <= elapsed < 0.6
+    assert all(0.2 <= executor.wall_times[name] < 0.4 for name in metrics)
+
+
+def test_metrics_sharing_a_resource_take_turns():
+    executor = MetricExecutor(resource_limits={"cpu": 1, "llm": 2})
+    start_times = {}
+
+    def timed_metric(name, seconds):
+        async def calculate():
+            start_times[name] = time.monotonic()
+            await asyncio.sleep(seconds)
+            return np.array([0])
+        return calculate
+
+    metrics = {
+        "visual": timed_metric("visual", 0.2),
+        "lighthouse": timed_metric("lighthouse", 0.2),
+        "quality": timed_metric("quality", 0.2),
+    }
+    resources = {"visual": "cpu", "lighthouse": "cpu", "quality": "llm"}
+
+    start_time = time.monotonic()
+    asyncio.run(executor.run(metrics, resources))
+    elapsed = time.monotonic() - start_time
+
+    # Lighthouse waits for the cpu slot Visual holds, Quality runs next to them
+    assert start_times["lighthouse"] - start_times["visual"] >= 0.2
+    assert start_times["quality"] - start_time < 0.1
+    assert 0.4 <= elapsed < 0.6
+
+
+def test_gated_metrics_only_score_passing_solutions():
+    generator = TaskGenerator()
+    accuracy = FixedReward({"a": 0.9, "b": 0.1, "c": 0.5})
+    seo = FixedReward({"a": 0.7, "b": 0.8, "c": 0.6})
+    quality = FixedReward({"a": 0.2, "b": 0.3, "c": 0.4})
+    generator.metrics = {"Accuracy": accuracy, "Seo": seo, "Quality": quality}
+    solutions = [Solution(html=html) for html in ["a", "b", "c"]]
+
+    scores = asyncio.run(generator.calculate_scores(
+        Task(task_id="task"), solutions, metric_names=["Accuracy", "Seo"], gated_metric_names=["Seo"],
+    ))
+
+    assert set(scores) == {"Accuracy", "Seo", "Quality"}
+    assert np.allclose(scores["Accuracy"], [0.9, 0.1, 0.5])
+    assert np.allclose(scores["Seo"], [0.7, 0, 0.6])
+    assert np.allclose(scores["Quality"], [0, 0, 0])
+    assert seo.scored_htmls == ["a", "c"] and quality.scored_htmls == []
+
+
+if __name__ == "__main__":
+    test_metrics_run_concurrently_and_are_timed()
+    test_metrics_sharing_a_resource_take_turns()
+    test_gated_metrics_only_score_passing_solutions()
@@ -0,0 +1,100 @@
+from init_test import init_test
+init_test()
+
+import asyncio
+import numpy as np
+from typing import List
+
+from webgenie.helpers.htmls import html_digest
+from webgenie.rewards import Reward
+from webgenie.tasks import Task, Solution
+from webgenie.tasks.score_cache import ScoreCache
+from webgenie.tasks.task_generator import TaskGenerator
+
+
+class LengthReward(Reward):
+    def __init__(self):
+        self.scored_htmls = []
+
+    async def reward(self, task: Task, solutions: List[Solution]) -> np.ndarray:
+        self.scored_htmls.extend(solution.html for solution in solutions)
+        return np.array([len(solution.html.strip()) for solution in solutions], dtype=float)
+
+
+class FlakyReward(Reward):
+    def __init__(self):
+        self.calls = 0
+
+    async def reward(self, task: Task, solutions: List[Solution]) -> np.ndarray:
+        # Fails the first time, like a solution that timed out
+        self.calls += 1
+        return np.full(len(solutions), 0.0 if self.calls == 1 else 1.0)
+
+
+def test_html_digest_ignores_line_endings_and_trailing_spaces():
+    html = "<html>\n  <body>Hello</body>\n</html>\n"
+    assert html_digest(html) == html_digest("<html>  \r\n  <body>Hello</body>\r\n</html>")
+    assert html_digest(html) != html_digest(html.replace("Hello", "World"))
+
+
+def test_score_cache_evicts_least_recently_used():
+    cache = ScoreCache(max_size=2)
+    cache.set("task", "a", "metric", 1.0)
+    cache.set("task", "b", "metric", 2.0)
+    assert cache.get("task", "a", "metric") == 1.0
+    cache.set("task", "c", "metric", 3.0)
+    assert cache.get("task", "b", "metric") is None
+    assert cache.get("task", "a", "metric") == 1.0 and len(cache) == 2
+
+
+def test_duplicate_solutions_are_scored_once():
+    generator = TaskGenerator()
+    reward = LengthReward()
+    generator.metrics = {"length": reward}
+    task = Task(task_id="task")
+    solutions = [
+        Solution(html="<p>a</p>", miner_uid=1),
+        Solution(html="<p>a</p>\r\n", miner_uid=2),
+        Solution(html="<p>bb</p>", miner_uid=3),
+    ]
+
+    scores = asyncio.run(generator.calculate_scores(task, solutions))
+    assert np.array_equal(scores["length"], [8, 8, 9])
+    assert reward.scored_htmls == ["<p>a</p>", "<p>bb</p>"]
+
+    scores = asyncio.run(generator.calculate_scores(task, solutions + [Solution(html="<p>ccc</p>")]))
+    assert np.array_equal(scores["length"], [8, 8, 9, 10])
+    assert reward.scored_htmls == ["<p>a</p>", "<p>bb</p>", "<p>ccc</p>"]
+
+
+def test_scores_are_cached_per_task_instance():
+    generator = TaskGenerator()
+    reward = LengthReward()
+    generator.metrics = {"length": reward}
+    solutions = [Solution(html="<p>a</p>", miner_uid=1)]
+
+    # The same url drawn again is a new task, its ground truth may have changed
+    asyncio.run(generator.calculate_scores(Task(task_id="url"), solutions))
+    asyncio.run(generator.calculate_scores(Task(task_id="url"), solutions))
+    assert reward.scored_htmls == ["<p>a</p>", "<p>a</p>"]
+
+
+def test_failed_scores_are_not_cached():
+    generator = TaskGenerator()
+    reward = FlakyReward()
+    generator.metrics = {"flaky": reward}
+    task = Task(task_id="task")
+    solutions = [Solution(html="<p>a</p>", miner_uid=1)]
+
+    assert np.array_equal(asyncio.run(generator.calculate_scores(task, solutions))["flaky"], [0])
+    assert np.array_equal(asyncio.run(generator.calculate_scores(task, solutions))["flaky"], [1])
+    assert np.array_equal(asyncio.run(generator.calculate_scores(task, solutions))["flaky"], [1])
+    assert reward.calls == 2
+
+
+if __name__ == "__main__":
+    test_html_digest_ignores_line_endings_and_trailing_spaces()
+    test_score_cache_evicts_least_recently_used()
+    test_duplicate_solutions_are_scored_once()
+    test_scores_are_cached_per_task_instance()
+    test_failed_scores_are_not_cached()
@@ -0,0 +1,51 @@
+from init_test import init_test
+init_test()
+
+import asyncio
+
+from webgenie.helpers.settle import track_requests, wait_for_settled
+
+
+class FakePage:
+    def __init__(self):
+        self.handlers = {}
+        self.evaluations = 0
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event, request):
+        for handler in self.handlers.get(event, []):
+            handler(request)
+
+    async def evaluate(self, script, args):
+        self.evaluations += 1
+
+
+async def settle_after_request_finishes(page):
+    track_requests(page)
+    page.emit("request", "tailwind.css")
+    page.emit("request", "placeholder.jpg")
+    page.emit("requestfailed", "placeholder.jpg")
+
+    async def finish_request():
+        await asyncio.sleep(0.05)
+        page.emit("requestfinished", "tailwind.css")
+
+    _, settle_time = await asyncio.gather(finish_request(), wait_for_settled(page))
+    return settle_time
+
+
+def test_wait_for_settled_waits_for_pending_requests():
+    page = FakePage()
+    settle_time = asyncio.run(settle_after_request_finishes(page))
+    assert settle_time >= 50 and page.evaluations == 1
+
+    # A request that never finishes only holds the page up until the timeout
+    page.emit("request", "slow.js")
+    settle_time = asyncio.run(wait_for_settled(page, timeout=100))
+    assert 100 <= settle_time < 1000
+
+
+if __name__ == "__main__":
+    test_wait_for_settled_waits_for_pending_requests()
@@ -22,6 +22,25 @@ class Challenge(BaseModel):
     solutions: List[Solution] = Field(default=[], description="The solutions to the task")
     competition_type: str = Field(default="", description="The type of competition")
     session: int = Field(default=0, description="The session number")
+    metrics: List[str] = Field(
+        default=[ACCURACY_METRIC_NAME, SEO_METRIC_NAME, QUALITY_METRIC_NAME],
+        description="The metrics the aggregated score uses",
+    )
+    gated_metrics: List[str] = Field(
+        default=[],
+        description="The metrics only computed for solutions whose accuracy passes the gate",
+    )
+    accuracy_gate: float = Field(default=0.4, description="The accuracy a solution needs to be scored on the gated metrics")
+
+    async def calculate_metric_scores(self) -> dict[str, np.ndarray]:
+        return await self.task.generator.calculate_scores(
+            self.task,
+            self.solutions,
+            metric_names=self.metrics,
+            gated_metric_names=self.gated_metrics,
+            gate_metric_name=ACCURACY_METRIC_NAME,
+            gate_threshold=self.accuracy_gate,
+        )
 
     async def calculate_scores(self) -> dict[str, np.ndarray]:
         pass
@@ -29,39 +48,44 @@ class Challenge(BaseModel):
 
 class AccuracyChallenge(Challenge):
     competition_type: str = Field(default=ACCURACY_COMPETITION_TYPE, description="The type of competition")
+    metrics: List[str] = Field(default=[ACCURACY_METRIC_NAME, QUALITY_METRIC_NAME])
 
     async def calculate_scores(self) -> dict[str, np.ndarray]:
-        scores = await self.task.generator.calculate_scores(self.task, self.solutions)
+        scores = await self.calculate_metric_scores()
         aggregated_scores = scores[ACCURACY_METRIC_NAME] * 0.9 + scores[QUALITY_METRIC_NAME] * 0.1
         return aggregated_scores, scores
 
 
 class SeoChallenge(Challenge):
     competition_type: str = Field(default=SEO_COMPETITION_TYPE, description="The type of competition")
+    metrics: List[str] = Field(default=[ACCURACY_METRIC_NAME, SEO_METRIC_NAME])
+    gated_metrics: List[str] = Field(default=[SEO_METRIC_NAME])
 
     async def calculate_scores(self) -> dict[str, np.ndarray]:
-        scores = await self.task.generator.calculate_scores(self.task, self.solutions)
+        scores = await self.calculate_metric_scores()
         accuracy_scores = scores[ACCURACY_METRIC_NAME]
         seo_scores = scores[SEO_METRIC_NAME]
-        aggregated_scores = np.where(accuracy_scores > 0.4, seo_scores, 0)
+        aggregated_scores = np.where(accuracy_scores > self.accuracy_gate, seo_scores, 0)
         return aggregated_scores, scores
 
 
 class QualityChallenge(Challenge):
     competition_type: str = Field(default=QUALITY_COMPETITION_TYPE, description="The type of competition")
+    metrics: List[str] = Field(default=[ACCURACY_METRIC_NAME, QUALITY_METRIC_NAME])
+    gated_metrics: List[str] = Field(default=[QUALITY_METRIC_NAME])
 
     async def calculate_scores(self) -> dict[str, np.ndarray]:
-        scores = await self.task.generator.calculate_scores(self.task, self.solutions)
+        scores = await self.calculate_metric_scores()
         accuracy_scores = scores[ACCURACY_METRIC_NAME]
         quality_scores = scores[QUALITY_METRIC_NAME]
-        aggregated_scores = np.where(accuracy_scores > 0.4, quality_scores, 0)
+        aggregated_scores = np.where(accuracy_scores > self.accuracy_gate, quality_scores, 0)
         return aggregated_scores, scores
 
 class BalancedChallenge(Challenge):
     competition_type: str = Field(default=BALANCED_COMPETITION_TYPE, description="The type of competition")
 
     async def calculate_scores(self) -> dict[str, np.ndarray]:
-        scores = await self.task.generator.calculate_scores(self.task, self.solutions)
+        scores = await self.calculate_metric_scores()
         accuracy_scores = scores[ACCURACY_METRIC_NAME]
         quality_scores = scores[QUALITY_METRIC_NAME]
         seo_scores = scores[SEO_METRIC_NAME]
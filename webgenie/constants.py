@@ -33,6 +33,15 @@ MAX_DEBUG_IMAGE_STRING_LENGTH = 20 # max debug image string length
 
 PLACE_HOLDER_IMAGE_URL = "https://picsum.photos/seed/picsum/800/600" # place holder image url
 
+PLACE_HOLDER_IMAGE_SIZE = (800, 600) # size of the place holder image served locally to renders
+
+ALLOWED_RESOURCE_PATTERNS = [
+    r"https?://cdn.jsdelivr.net/npm/tailwindcss@[^/]+/dist/tailwind.min.css",
+    r"https?://stackpath.bootstrapcdn.com/bootstrap/[^/]+/css/bootstrap.min.css",
+    r"https?://code.jquery.com/jquery-[^/]+.min.js",
+    r"https?://stackpath.bootstrapcdn.com/bootstrap/[^/]+/js/bootstrap.bundle.min.js",
+] # css and javascript urls miner html may reference
+
 DEFAULT_LOAD_TIME = 1000 # default load time
 
 GROUND_TRUTH_HTML_LOAD_TIME = 20000 # max page load time
@@ -41,14 +50,88 @@ CHROME_HTML_LOAD_TIME = 60000 # miner html load time
 
 JAVASCRIPT_RUNNING_TIME = 1000 # javascript running time
 
+RENDER_QUIET_TIME = 100 # ms without dom mutations or layout shifts after which a render counts as settled
+
+RENDER_REQUEST_POLL_INTERVAL = 10 # ms between checks for requests still in flight while a render settles
+
 MINER_HTML_LOAD_TIME = 2000 # miner html load time
 
+RENDER_STAGE_TIMEOUT = 120 # seconds to load, settle, screenshot and read the elements of one page
+
+EXTRACTION_STAGE_TIMEOUT = 60 # seconds to extract SIFT features and colors from one page's elements
+
+MATCHING_STAGE_TIMEOUT = 120 # seconds to score one solution against the original page
+
+VISUAL_SOLUTION_TIMEOUT = 600 # seconds a scoring worker may spend on one solution, every stage included
+
+BROWSER_POOL_MAX_PAGES = 4 # max pages leased at once from the browser pool of a process
+
+BROWSER_RESTART_AFTER_PAGES = 200 # restart the pooled browser after this many pages
+
+BROWSER_CLOSE_TIMEOUT = 5 # seconds to close a page or the browser before it is treated as stuck
+
+SCREENSHOT_CAPTURE_MODE = os.getenv("SCREENSHOT_CAPTURE_MODE", "playwright") # "playwright" full page png or "cdp" fast png tiles
+
+INPAINT_MODE = os.getenv("INPAINT_MODE", "css") # "css" erases texts with a stylesheet on the loaded page, "rewrite" rewrites the html and loads it again
+
+CDP_CAPTURE_TILE_HEIGHT = 4096 # rows captured per tile in "cdp" screenshot mode
+
+SCORING_WORKER_COUNT = int(os.getenv("SCORING_WORKER_COUNT", os.cpu_count())) # long-lived scoring worker processes
+
+SCORING_WORKER_MAX_TASKS = 50 # replace a scoring worker after this many tasks, so leaks cannot pile up
+
+SCORING_WORKER_START_METHOD = os.getenv("SCORING_WORKER_START_METHOD", "forkserver") # "forkserver" or "spawn", forking a threaded validator is unsafe
+
+HTML_ELEMENT_COST = 200 # characters of html that rendering and matching one element costs, to order scoring work
+
+ORIGINAL_ARTIFACT_CACHE_SIZE = 2 # rendered ground truth pages kept by each scoring worker
+
+CLIP_BATCH_SIZE = 16 # images embedded per CLIP forward pass
+
+CLIP_NUM_THREADS = int(os.getenv("CLIP_NUM_THREADS", 1)) # torch threads per scoring process, each core already runs a worker
+
+CLIP_PYRAMID_MIN_SIZE = 448 # CLIP reads a screenshot reduced to at least this many pixels per side, twice its 224 pixel input
+
+HISTOGRAM_PYRAMID_MIN_SIZE = 640 # the histogram reads every n-th pixel of a screenshot, keeping at least this many per side
+
+TEXT_RATIO_CACHE_SIZE = 65536 # memoized SequenceMatcher ratios per scoring process
+
+SIFT_TILE_HEIGHT = 2048 # regions taller than this are scanned for SIFT features in tiles
+
+SIFT_TILE_OVERLAP = 128 # rows shared by neighbouring SIFT tiles, so keypoints near a seam keep their context
+
+SIFT_ROI_CONTEXT = 0 # pixels of context scanned around each element, more finds keypoints on element borders at a higher cost
+
+SIFT_MAX_KEYPOINTS_PER_ROI = 128 # keep at most this many of the coarsest SIFT keypoints per element
+
+SIFT_MATCHING_MODE = os.getenv("SIFT_MATCHING_MODE", "mutual_nn") # "mutual_nn", "ratio" or the exact "assignment"
+
+SIFT_RATIO_TEST = 0.8 # nearest descriptor must be this much closer than the second nearest in "ratio" mode
+
+SPARSE_ASSIGNMENT_MIN_ELEMENTS = 1000 # element lists this long are only matched to elements nearby on the page
+
+SPARSE_ASSIGNMENT_MAX_DISPLACEMENT = 0.1 # max shift of a matched element's top-left corner, in page widths and heights
+
+SCORE_CACHE_SIZE = 4096 # (task, html digest, metric) scores kept by each task generator
+
+CPU_METRIC_CONCURRENCY = int(os.getenv("CPU_METRIC_CONCURRENCY", 1)) # metrics scored on the scoring workers at the same time, Visual and Lighthouse each keep every worker busy
+
+LLM_METRIC_CONCURRENCY = int(os.getenv("LLM_METRIC_CONCURRENCY", 2)) # metrics waiting on remote llm calls at the same time
+
 MAX_MINER_HTML_LEN = 1000000 # max miner html length
 
 WORK_DIR = "work" # work dir
 
 LIGHTHOUSE_SERVER_WORK_DIR = f"{WORK_DIR}/lighthouse_server_work" # lighthouse server work dir
 
+ASSET_CACHE_DIR = os.getenv("ASSET_CACHE_DIR", f"{WORK_DIR}/asset_cache") # allowed css and javascript served to renders from disk
+
+ASSET_FETCH_ON_MISS = os.getenv("ASSET_FETCH_ON_MISS", "True").lower() == "true" # download an allowed asset missing from the cache once, turn off on air-gapped validators
+
+GROUND_TRUTH_FEATURES_DIR = f"{WORK_DIR}/ground_truth_features" # ground truth feature arrays published once and memory mapped by the scoring workers
+
+GROUND_TRUTH_FEATURES_TTL = 2 * 60 * 60 # seconds before published ground truth features that nobody released are swept away
+
 HTML_EXTENSION = ".html" # html extension
 
 IMAGE_EXTENSION = ".png" # image extension
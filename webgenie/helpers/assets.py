@@ -0,0 +1,136 @@
+import bittensor as bt
+import hashlib
+import io
+import mimetypes
+import os
+import re
+import uuid
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+from PIL import Image
+
+from webgenie.constants import (
+    ALLOWED_RESOURCE_PATTERNS,
+    ASSET_CACHE_DIR,
+    ASSET_FETCH_ON_MISS,
+    PLACE_HOLDER_IMAGE_URL,
+    PLACE_HOLDER_IMAGE_SIZE,
+)
+
+# Schemes a render can always load, they never leave the machine
+LOCAL_URL_SCHEMES = ("file", "data", "blob", "about")
+
+# Assets already read from disk in this process, keyed by url
+_assets: dict[str, Tuple[bytes, str]] = {}
+
+
+def is_allowed_resource(url: str) -> bool:
+    return any(re.match(pattern, url) for pattern in ALLOWED_RESOURCE_PATTERNS)
+
+
+def asset_cache_path(url: str) -> str:
+    extension = os.path.splitext(urlparse(url).path)[1]
+    return os.path.join(ASSET_CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest() + extension)
+
+
+def content_type_of(url: str) -> str:
+    content_type, _ = mimetypes.guess_type(urlparse(url).path)
+    return content_type or "application/octet-stream"
+
+
+def write_asset(url: str, body: bytes):
+    os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+    path = asset_cache_path(url)
+    # Write to a temporary file first, so concurrent renders never read half an asset
+    temp_path = f"{path}.{uuid.uuid4()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(body)
+    os.replace(temp_path, path)
+
+
+def read_asset(url: str) -> Optional[bytes]:
+    path = asset_cache_path(url)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def place_holder_image(route) -> bytes:
+    """
+    The picsum placeholder, fetched once into the asset cache. A flat gray jpeg stands in
+    for it when it cannot be fetched, kept out of the cache so a later process retries.
+    """
+    body = read_asset(PLACE_HOLDER_IMAGE_URL)
+    if body is None:
+        body = await fetch_asset(route, PLACE_HOLDER_IMAGE_URL)
+    if body is None:
+        bt.logging.warning(f"Place holder image {PLACE_HOLDER_IMAGE_URL} is unavailable, serving a gray image instead")
+        buffer = io.BytesIO()
+        Image.new("RGB", PLACE_HOLDER_IMAGE_SIZE, color=(200, 200, 200)).save(buffer, format="jpeg")
+        body = buffer.getvalue()
+    return body
+
+
+async def fetch_asset(route, url: str) -> Optional[bytes]:
+    if not ASSET_FETCH_ON_MISS:
+        return None
+    try:
+        response = await route.fetch()
+        if not response.ok:
+            bt.logging.warning(f"Failed to fetch asset {url}: status {response.status}")
+            return None
+        body = await response.body()
+    except Exception as e:
+        bt.logging.warning(f"Failed to fetch asset {url}: {e}")
+        return None
+    write_asset(url, body)
+    bt.logging.debug(f"Cached asset {url}")
+    return body
+
+
+async def load_asset(route, url: str) -> Optional[Tuple[bytes, str]]:
+    if url in _assets:
+        return _assets[url]
+
+    if url == PLACE_HOLDER_IMAGE_URL:
+        body, content_type = await place_holder_image(route), "image/jpeg"
+    elif is_allowed_resource(url):
+        body = read_asset(url)
+        if body is None:
+            body = await fetch_asset(route, url)
+        if body is None:
+            return None
+        content_type = content_type_of(url)
+    else:
+        return None
+
+    _assets[url] = (body, content_type)
+    return _assets[url]
+
+
+async def route_assets(route):
+    """
+    Route handler serving renders from the asset cache: the allowed css and javascript
+    and the placeholder image are fulfilled locally, anything else on the network fails at once.
+    Attach with `await page.route("**/*", route_assets)` to miner renders only, the ground
+    truth must load the resources its page links to.
+    """
+    url = route.request.url
+    if urlparse(url).scheme in LOCAL_URL_SCHEMES:
+        await route.continue_()
+        return
+
+    asset = await load_asset(route, url)
+    if asset is None:
+        await route.abort("blockedbyclient")
+        return
+
+    body, content_type = asset
+    await route.fulfill(
+        status=200,
+        body=body,
+        content_type=content_type,
+        headers={"Access-Control-Allow-Origin": "*"},
+    )
@@ -1,5 +1,6 @@
 import bittensor as bt
 import asyncio
+import hashlib
 import os
 import re
 import uuid
@@ -13,40 +14,57 @@ from playwright.async_api import async_playwright
 from webgenie.constants import (
     WORK_DIR,
     CHROME_HTML_LOAD_TIME,
-    JAVASCRIPT_RUNNING_TIME,
+    HTML_ELEMENT_COST,
     PLACE_HOLDER_IMAGE_URL,
 )
+from webgenie.helpers.assets import is_allowed_resource
 from webgenie.helpers.images import image_to_base64
+from webgenie.helpers.settle import track_requests, wait_for_settled
     
 
 def is_valid_resources(html_content: str) -> bool:
     """
     Check if the resources in the HTML content are valid.
     """
-    # List of allowed patterns for CSS and JavaScript resources
-    allowed_patterns = [
-        r"https?://cdn.jsdelivr.net/npm/tailwindcss@[^/]+/dist/tailwind.min.css",
-        r"https?://stackpath.bootstrapcdn.com/bootstrap/[^/]+/css/bootstrap.min.css",
-        r"https?://code.jquery.com/jquery-[^/]+.min.js",
-        r"https?://stackpath.bootstrapcdn.com/bootstrap/[^/]+/js/bootstrap.bundle.min.js",
-    ]
-    
     soup = BeautifulSoup(html_content, 'html.parser')
     resources = soup.find_all(['link', 'script'])
     
     for resource in resources:
         if resource.name == 'link' and resource.get('rel') == ['stylesheet']:
             href = resource.get('href')
-            if href and not any(re.match(pattern, href) for pattern in allowed_patterns):
+            if href and not is_allowed_resource(href):
                 return False
         elif resource.name == 'script':
             src = resource.get('src')
-            if src and not any(re.match(pattern, src) for pattern in allowed_patterns):
+            if src and not is_allowed_resource(src):
                 return False
 
     return True
 
 
+def normalize_html(html_content: str) -> str:
+    """
+    Normalize the HTML content without changing how it renders.
+    """
+    html_content = html_content.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [line.rstrip() for line in html_content.split("\n")]
+    return "\n".join(lines).strip()
+
+
+def html_digest(html_content: str) -> str:
+    """
+    Digest of the normalized HTML content, shared by solutions that render the same.
+    """
+    return hashlib.sha256(normalize_html(html_content).encode("utf-8")).hexdigest()
+
+
+def estimate_html_cost(html_content: str) -> int:
+    """
+    Rough cost of rendering and scoring the HTML content, from its size and element count.
+    """
+    return len(html_content) + HTML_ELEMENT_COST * len(re.findall(r"<[a-zA-Z]", html_content))
+
+
 def is_valid_html(html_content: str) -> bool:
     """
     Check if the HTML is valid.
@@ -97,12 +115,13 @@ async def html_to_screenshot(html_content: str, page_load_time: int = 1000) -> s
             # Choose a browser, e.g., Chromium, Firefox, or WebKit
             browser = await p.chromium.launch()
             page = await browser.new_page()
+            track_requests(page)
 
             # Navigate to the URL
             await page.goto(url, timeout=CHROME_HTML_LOAD_TIME)
 
-            await page.wait_for_load_state('networkidle')
-            await page.wait_for_timeout(JAVASCRIPT_RUNNING_TIME)
+            settle_time = await wait_for_settled(page)
+            bt.logging.debug(f"Screenshot page settled in {settle_time:.0f} ms")
             
             # Take the screenshot
             await page.screenshot(
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from weakref import WeakKeyDictionary
+
+from webgenie.constants import (
+    CHROME_HTML_LOAD_TIME,
+    JAVASCRIPT_RUNNING_TIME,
+    RENDER_QUIET_TIME,
+    RENDER_REQUEST_POLL_INTERVAL,
+)
+
+# Requests each tracked page has started and not yet finished
+_pending_requests = WeakKeyDictionary()
+
+# Resolves once the fonts are loaded and the document has neither mutated nor shifted
+# its layout for `quietTime` ms, or after `maxBusyTime` ms of a page that keeps changing
+SETTLE_SCRIPT = """
+async ([quietTime, maxBusyTime, timeout]) => {
+    const start = performance.now();
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+    let lastChange = start;
+    const onChange = () => { lastChange = performance.now(); };
+
+    const mutationObserver = new MutationObserver(onChange);
+    mutationObserver.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    let layoutShiftObserver = null;
+    try {
+        layoutShiftObserver = new PerformanceObserver(onChange);
+        layoutShiftObserver.observe({ type: "layout-shift" });
+    } catch (e) {}
+
+    try {
+        if (document.fonts) {
+            await Promise.race([document.fonts.ready, sleep(timeout)]);
+        }
+        const busyUntil = Math.min(performance.now() + maxBusyTime, start + timeout);
+        while (performance.now() - lastChange < quietTime && performance.now() < busyUntil) {
+            await sleep(Math.max(quietTime - (performance.now() - lastChange), 1));
+        }
+    } finally {
+        mutationObserver.disconnect();
+        if (layoutShiftObserver) {
+            layoutShiftObserver.disconnect();
+        }
+    }
+}
+"""
+
+
+def track_requests(page):
+    """
+    Count the requests `page` has in flight. Must be called before the page navigates.
+    """
+    if page in _pending_requests:
+        return
+    pending = set()
+    _pending_requests[page] = pending
+    page.on("request", pending.add)
+    page.on("requestfinished", pending.discard)
+    page.on("requestfailed", pending.discard)
+
+
+async def wait_for_settled(
+    page,
+    timeout: int = CHROME_HTML_LOAD_TIME,
+    quiet_time: int = RENDER_QUIET_TIME,
+    max_busy_time: int = JAVASCRIPT_RUNNING_TIME,
+) -> float:
+    """
+    Wait until the page has no requests in flight, its fonts are loaded and it has been
+    free of mutations and layout shifts for `quiet_time` ms. Pages that keep changing
+    get `max_busy_time` ms after their last request, and the whole wait is capped by
+    `timeout`. Returns the ms the page needed to settle.
+    """
+    start = time.monotonic()
+    deadline = start + timeout / 1000
+    pending = _pending_requests.get(page, set())
+
+    while True:
+        while pending and time.monotonic() < deadline:
+            await asyncio.sleep(RENDER_REQUEST_POLL_INTERVAL / 1000)
+        remaining = max(deadline - time.monotonic(), 0) * 1000
+        await page.evaluate(SETTLE_SCRIPT, [quiet_time, max_busy_time, remaining])
+        # Scripts may have started new requests while the document was settling
+        if not pending or time.monotonic() >= deadline:
+            break
+
+    return (time.monotonic() - start) * 1000
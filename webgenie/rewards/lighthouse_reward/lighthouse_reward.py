@@ -2,12 +2,12 @@
 # (https://arxiv.org/pdf/2402.08699#page=11&zoom=100,384,458) is our inspiration for this reward.
 
 import bittensor as bt
-import os
-import multiprocessing
 import numpy as np
 from typing import List
 
+from webgenie.helpers.htmls import estimate_html_cost
 from webgenie.rewards.reward import Reward
+from webgenie.rewards.worker_pool import scoring_worker_pool
 from webgenie.tasks import Task, Solution
 
 from .get_lighthouse_score import get_lighthouse_score
@@ -17,44 +17,36 @@ class LighthouseReward(Reward):
     def __init__(self):
         pass
 
-    def sync_reward_worker(self, htmls: List[str]) -> List[float]:
+    def sync_reward_worker(self, html: str) -> float:
         try:
-            scores_dict = get_lighthouse_score(htmls)
-            scores = []
+            score_dict = get_lighthouse_score([html])[0]
             weights = [0, 0.25, 0.25, 0.5]
-            for score_dict in scores_dict:
-                score = (
-                    score_dict['performance'] * weights[0] + 
-                    score_dict['accessibility'] * weights[1] + 
-                    score_dict['best-practices'] * weights[2] + 
-                    score_dict['seo'] * weights[3]
-                )
-                scores.append(score)
-            return scores
+            return (
+                score_dict['performance'] * weights[0] + 
+                score_dict['accessibility'] * weights[1] + 
+                score_dict['best-practices'] * weights[2] + 
+                score_dict['seo'] * weights[3]
+            )
         except Exception as e:
             bt.logging.error(f"Error getting lighthouse score: {e}")
-            return [0] * len(htmls)
+            return 0
 
     async def reward(self, task: Task, solutions: List[Solution]) -> np.ndarray:
         bt.logging.info(f"Rewarding lighthouse task")
         htmls = [solution.html for solution in solutions]
-        
-        # Use ProcessPoolExecutor for parallel processing
-        with multiprocessing.Pool(processes=os.cpu_count()) as pool:
-            # Convert solutions into chunks for parallel processing
-            chunk_size = max(1, len(htmls) // os.cpu_count()) 
-
-            html_chunks = [htmls[i:i + chunk_size] for i in range(0, len(htmls), chunk_size)]
-            
-            # Create partial tasks for each chunk
-            futures = []
-            for chunk in html_chunks:
-                future = pool.apply_async(self.sync_reward_worker, args=(chunk,))
-                futures.append(future)
-            
-            # Gather all results
-            scores = []
-            for future in futures:
-                scores.extend(future.get())
+
+        # Every html is its own task, the heaviest pages go first so they never trail at the end
+        results = await scoring_worker_pool.run_each(
+            self.sync_reward_worker,
+            htmls,
+            costs=[estimate_html_cost(html) for html in htmls],
+        )
+
+        # Gather all results
+        scores = []
+        for result in results:
+            if isinstance(result, BaseException):
+                bt.logging.error(f"Error in lighthouse reward worker: {result}")
+                result = 0
+            scores.append(result)
         return np.array(scores)
-    
\ No newline at end of file
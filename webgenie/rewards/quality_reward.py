@@ -11,6 +11,7 @@ from webgenie.helpers.llms import openai_call
 from webgenie.prompts import PROMPT_QUALITY
 from webgenie.rewards.reward import Reward
 from webgenie.tasks import Task, Solution
+from webgenie.tasks.metric_types import LLM_METRIC_RESOURCE
 
 
 class ScoreResponse(BaseModel):
@@ -18,6 +19,7 @@ class ScoreResponse(BaseModel):
 
 
 class QualityReward(Reward):
+    resource = LLM_METRIC_RESOURCE
 
     async def _get_score(self, solution: Solution) -> float:
         try:
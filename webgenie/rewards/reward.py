@@ -3,9 +3,13 @@ import numpy as np
 from typing import List
 
 from webgenie.tasks import Task, Solution
+from webgenie.tasks.metric_types import CPU_METRIC_RESOURCE
 
 
 class Reward(ABC):
+    # The resource the reward mostly waits on, metrics sharing one take turns
+    resource: str = CPU_METRIC_RESOURCE
+
     @abstractmethod
     async def reward(self, task: Task, solutions: List[Solution]) -> np.ndarray:
         pass
\ No newline at end of file
@@ -14,6 +14,7 @@ from webgenie.prompts import PROMPT_RTC
 from webgenie.rewards.reward import Reward
 from webgenie.rewards.rtc_reward import s_bert
 from webgenie.tasks import Task, Solution
+from webgenie.tasks.metric_types import LLM_METRIC_RESOURCE
 
 
 class PromptResponse(BaseModel):
@@ -21,6 +22,7 @@ class PromptResponse(BaseModel):
 
 
 class RtcReward(Reward):
+    resource = LLM_METRIC_RESOURCE
 
     async def _get_prompt(self, task: Task, solution: Solution) -> str:
         response = await openai_call(
@@ -0,0 +1,114 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+from webgenie.constants import (
+    SPARSE_ASSIGNMENT_MIN_ELEMENTS,
+    SPARSE_ASSIGNMENT_MAX_DISPLACEMENT,
+)
+
+
+def candidate_pairs(predicted_boxes: np.ndarray, original_boxes: np.ndarray, max_displacement: float):
+    """
+    (rows, cols) of the box pairs whose top-left corners are at most `max_displacement`
+    apart on both axes, looked up through a grid of `max_displacement` sized cells.
+    """
+    rows, cols = [], []
+    if len(predicted_boxes) == 0 or len(original_boxes) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    original_corners = original_boxes[:, :2]
+    original_cells = np.floor(original_corners / max_displacement).astype(int)
+    grid = {}
+    for j, cell in enumerate(map(tuple, original_cells)):
+        grid.setdefault(cell, []).append(j)
+    grid = {cell: np.array(indices) for cell, indices in grid.items()}
+
+    predicted_corners = predicted_boxes[:, :2]
+    predicted_cells = np.floor(predicted_corners / max_displacement).astype(int)
+    for i, (cx, cy) in enumerate(predicted_cells):
+        neighbours = [
+            grid[(cx + dx, cy + dy)]
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            if (cx + dx, cy + dy) in grid
+        ]
+        if not neighbours:
+            continue
+        candidates = np.concatenate(neighbours)
+        shift = np.abs(original_corners[candidates] - predicted_corners[i]).max(axis=1)
+        candidates = np.sort(candidates[shift <= max_displacement])
+        rows.append(np.full(len(candidates), i))
+        cols.append(candidates)
+
+    if not rows:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+def sparse_assignment(rows: np.ndarray, cols: np.ndarray, costs: np.ndarray, n: int, m: int) -> np.ndarray:
+    """
+    Minimum cost matching over the candidate pairs only, where any element may stay unmatched.
+    Returns the indices of the matched pairs.
+
+    Every predicted element i gets a dummy partner m + i and every original element j a dummy
+    partner n + j, with the dummies of each candidate pair linked, so a full matching always exists
+    and leaving a pair unmatched costs the same as matching it at cost 0. The weights are shifted
+    to stay positive, as the sparse solver treats zeros as missing edges.
+    """
+    if len(rows) == 0:
+        return np.zeros(0, dtype=int)
+
+    shift = 1.0 - min(costs.min(), 0.0)
+    pair_count = len(rows)
+    predicted_dummies = np.arange(n)
+    original_dummies = np.arange(m)
+    biadjacency = csr_matrix(
+        (
+            np.concatenate([costs + shift, np.full(n + m + pair_count, shift)]),
+            (
+                np.concatenate([rows, predicted_dummies, n + original_dummies, n + cols]),
+                np.concatenate([cols, m + predicted_dummies, original_dummies, m + rows]),
+            ),
+        ),
+        shape=(n + m, m + n),
+    )
+    left, right = min_weight_full_bipartite_matching(biadjacency)
+
+    real = (left < n) & (right < m)
+    matched_rows, matched_cols = left[real], right[real]
+    pair_keys = rows * m + cols
+    order = np.argsort(pair_keys)
+    return order[np.searchsorted(pair_keys[order], matched_rows * m + matched_cols)]
+
+
+def match_elements(predicted_elements, original_elements, create_cost_matrix, create_cost_pairs, sparse=None):
+    """
+    Assign predicted elements to original elements at minimum cost.
+    Returns the matched (row_ind, col_ind) and their costs.
+
+    Long element lists only consider the pairs within SPARSE_ASSIGNMENT_MAX_DISPLACEMENT
+    of each other, scored with `create_cost_pairs`, instead of the dense cost matrix.
+    The two paths are not equivalent: the dense one may match elements further apart than
+    that at a low similarity, which the sparse one leaves unmatched at cost 0. With costs
+    of -similarity, the sparse similarity sum is never higher than the dense one and falls
+    short of it by at most the similarity of the far pairs the dense path matched.
+    """
+    n, m = len(predicted_elements), len(original_elements)
+    if sparse is None:
+        sparse = max(n, m) >= SPARSE_ASSIGNMENT_MIN_ELEMENTS
+
+    if not sparse:
+        cost_matrix = create_cost_matrix(predicted_elements, original_elements)
+        row_ind, col_ind = linear_sum_assignment(cost_matrix)
+        return row_ind, col_ind, cost_matrix[row_ind, col_ind]
+
+    rows, cols = candidate_pairs(
+        predicted_elements.scaled_boxes,
+        original_elements.scaled_boxes,
+        SPARSE_ASSIGNMENT_MAX_DISPLACEMENT,
+    )
+    costs = create_cost_pairs(predicted_elements, original_elements, rows, cols)
+    matched = sparse_assignment(rows, cols, costs, n, m)
+    return rows[matched], cols[matched], costs[matched]
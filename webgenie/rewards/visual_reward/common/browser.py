@@ -1,27 +1,219 @@
+import asyncio
 import bittensor as bt
+import os
+from contextlib import asynccontextmanager
 from playwright.async_api import async_playwright
 
+from webgenie.constants import (
+    BROWSER_POOL_MAX_PAGES,
+    BROWSER_RESTART_AFTER_PAGES,
+    BROWSER_CLOSE_TIMEOUT,
+)
+from webgenie.helpers.assets import route_assets
+from webgenie.helpers.settle import track_requests
 
-web_player = {
-    "web_driver": None,
-    "browser": None,
-}
 
+class BrowserPool:
+    """
+    A long-lived Chromium instance shared by every render of the current process.
 
-async def start_browser():
-    global web_player
-    web_driver = await async_playwright().start()
-    browser = await web_driver.chromium.launch(headless=True)
-    web_player["web_driver"] = web_driver
-    web_player["browser"] = browser
-    bt.logging.debug(f"Started browser.")
+    Pages are leased with `async with browser_pool.page() as page:` and handed back
+    to an idle list when released, so renders reuse one browser context instead of
+    launching a new Playwright driver and Chromium each time. The browser is
+    restarted when it disconnects, when a page cannot be closed or after
+    `restart_after_pages` leases. Pages leased with `intercept_assets=True`, the
+    default for miner renders, send every request through `route_assets` and never
+    reach the network; ground truth renders load their own resources.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = BROWSER_POOL_MAX_PAGES,
+        restart_after_pages: int = BROWSER_RESTART_AFTER_PAGES,
+    ):
+        self.max_pages = max_pages
+        self.restart_after_pages = restart_after_pages
+        self._reset()
+
+    def _reset(self):
+        self._web_driver = None
+        self._browser = None
+        self._context = None
+        self._loop = None
+        self._pid = None
+        self._lock = None
+        self._semaphore = None
+        # Idle pages, keyed by whether their requests go through route_assets
+        self._idle_pages = {True: [], False: []}
+        self._leased_pages = 0
+        self._served_pages = 0
+        self._stuck = False
+
+    def _is_owned(self) -> bool:
+        # Playwright objects are bound to the event loop and the process that created
+        # them, so a pool inherited through fork or left on a closed loop is unusable.
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return self._pid == os.getpid() and self._loop is loop
+
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None and self._is_owned()
+
+    async def start(self):
+        if self.is_running:
+            return
+        # Drop references to a browser owned by another loop or process without touching it.
+        self._reset()
+        self._loop = asyncio.get_running_loop()
+        self._pid = os.getpid()
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_pages)
+        await self._launch()
+
+    async def stop(self):
+        if not self.is_running:
+            self._reset()
+            return
+        await self._close()
+        self._reset()
+        bt.logging.debug(f"Stopped browser.")
+
+    async def _launch(self):
+        self._web_driver = await async_playwright().start()
+        self._browser = await self._web_driver.chromium.launch(headless=True)
+        self._context = await self._browser.new_context()
+        self._stuck = False
+        self._served_pages = 0
+        bt.logging.debug(f"Started browser.")
+
+    async def _close(self):
+        for page in self._idle_pages[True] + self._idle_pages[False]:
+            try:
+                await asyncio.wait_for(page.close(), timeout=BROWSER_CLOSE_TIMEOUT)
+            except Exception:
+                pass
+        self._idle_pages = {True: [], False: []}
+        try:
+            await asyncio.wait_for(self._browser.close(), timeout=BROWSER_CLOSE_TIMEOUT)
+        except Exception as e:
+            bt.logging.warning(f"Error closing browser: {e}")
+        try:
+            await self._web_driver.stop()
+        except Exception as e:
+            bt.logging.warning(f"Error stopping web driver: {e}")
+        self._web_driver = None
+        self._browser = None
+        self._context = None
+
+    async def _restart(self):
+        bt.logging.debug(f"Restarting browser after {self._served_pages} pages.")
+        await self._close()
+        await self._launch()
+
+    def _is_healthy(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    def _needs_restart(self) -> bool:
+        if not self._is_healthy() or self._stuck:
+            return True
+        return self._served_pages >= self.restart_after_pages and self._leased_pages == 0
+
+    async def _acquire_page(self, intercept_assets: bool):
+        async with self._lock:
+            if self._needs_restart():
+                await self._restart()
 
+            page = None
+            idle_pages = self._idle_pages[intercept_assets]
+            while idle_pages:
+                candidate = idle_pages.pop()
+                if not candidate.is_closed():
+                    page = candidate
+                    break
+            if page is None:
+                page = await self._context.new_page()
+                if intercept_assets:
+                    # Miner renders get the allowed assets from disk and never wait on the network
+                    await page.route("**/*", route_assets)
+                track_requests(page)
+
+            self._leased_pages += 1
+            self._served_pages += 1
+            return page
+
+    async def _release_page(self, page, intercept_assets: bool, recycle: bool):
+        try:
+            if recycle and self._is_healthy() and page.context is self._context:
+                # Wipe whatever the previous document left behind before reusing the page.
+                await page.evaluate(
+                    "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+                )
+                await page.goto("about:blank")
+                self._idle_pages[intercept_assets].append(page)
+            else:
+                await self._close_page(page)
+        except Exception:
+            await self._close_page(page)
+        finally:
+            self._leased_pages -= 1
+
+    async def _clear_cookies_if_idle(self):
+        # Cookies belong to the whole context, so they are only wiped while no page is
+        # rendering. New leases wait on the lock until they are gone.
+        async with self._lock:
+            if self._leased_pages == 0 and self._is_healthy():
+                try:
+                    await self._context.clear_cookies()
+                except Exception as e:
+                    bt.logging.warning(f"Error clearing cookies: {e}")
+
+    async def _close_page(self, page):
+        try:
+            await asyncio.wait_for(page.close(), timeout=BROWSER_CLOSE_TIMEOUT)
+        except Exception as e:
+            # A page that will not close, e.g. one spinning in a script, means a stuck browser
+            bt.logging.warning(f"Error closing page, restarting browser on the next lease: {e}")
+            self._stuck = True
+
+    @asynccontextmanager
+    async def page(self, intercept_assets: bool = True):
+        await self.start()
+        async with self._semaphore:
+            page = await self._acquire_page(intercept_assets)
+            recycle = False
+            try:
+                yield page
+                recycle = True
+            finally:
+                # A page whose render raised or was cancelled is in an unknown state.
+                await self._release_page(page, intercept_assets, recycle)
+                await self._clear_cookies_if_idle()
+
+
+browser_pool = BrowserPool()
+
+_event_loop = None
+_event_loop_pid = None
+
+
+def run_with_browser(coro):
+    """
+    Run `coro` on this process's persistent event loop, so the pooled browser
+    survives between calls instead of dying with a per-call `asyncio.run` loop.
+    """
+    global _event_loop, _event_loop_pid
+    if _event_loop is None or _event_loop.is_closed() or _event_loop_pid != os.getpid():
+        _event_loop = asyncio.new_event_loop()
+        _event_loop_pid = os.getpid()
+    return _event_loop.run_until_complete(coro)
+
+
+async def start_browser():
+    await browser_pool.start()
 
 
 async def stop_browser():
-    global web_player
-    await web_player["browser"].close()
-    await web_player["web_driver"].stop()
-    web_player["web_driver"] = None
-    web_player["browser"] = None
-    bt.logging.debug(f"Stopped browser.")
+    await browser_pool.stop()
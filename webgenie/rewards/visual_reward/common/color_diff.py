@@ -1,66 +1,128 @@
-
-from colormath.color_objects import sRGBColor, LabColor
-from colormath.color_conversions import convert_color
 import numpy as np
 
+# colormath's sRGBColor -> LabColor conversion: sRGB companding, the sRGB (D65) matrix
+# and the D65 2° reference white of the sRGB native illuminant.
+SRGB_TO_XYZ = np.array([
+    [0.412424, 0.357579, 0.180464],
+    [0.212656, 0.715158, 0.0721856],
+    [0.0193324, 0.119193, 0.950444],
+])
+D65_WHITE_POINT = np.array([0.95047, 1.0, 1.08883])
+CIE_E = 216.0 / 24389.0
+LAB_CACHE_MAX_SIZE = 65536
+
+lab_cache = {}
+
+
+def convert_rgb_to_lab(rgb):
+    """
+    Convert an (N, 3) array of RGB colors in the range [0, 255] to Lab.
+    """
+    rgb = np.asarray(rgb, dtype=float).reshape(-1, 3) / 255
+    linear_rgb = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear_rgb @ SRGB_TO_XYZ.T / D65_WHITE_POINT
+    f = np.where(xyz > CIE_E, np.cbrt(xyz), 7.787 * xyz + 16.0 / 116.0)
+    return np.stack([
+        116.0 * f[:, 1] - 16.0,
+        500.0 * (f[:, 0] - f[:, 1]),
+        200.0 * (f[:, 1] - f[:, 2]),
+    ], axis=1)
+
+
+def rgb_to_lab(rgb):
+    """
+    Convert an (N, 3) array of RGB colors in the range [0, 255] to Lab.
+    Pages reuse a handful of colors, so each distinct color is converted once per process.
+    """
+    rgb = np.asarray(rgb, dtype=float).reshape(-1, 3)
+    unique_rgb, inverse = np.unique(rgb, axis=0, return_inverse=True)
+    keys = [tuple(color) for color in unique_rgb.tolist()]
+
+    missing = [key for key in keys if key not in lab_cache]
+    if missing:
+        if len(lab_cache) + len(missing) > LAB_CACHE_MAX_SIZE:
+            lab_cache.clear()
+        for key, lab in zip(missing, convert_rgb_to_lab(missing)):
+            lab_cache[key] = lab
+
+    unique_lab = np.array([lab_cache[key] for key in keys]).reshape(-1, 3)
+    return unique_lab[inverse.reshape(-1)]
+
 
 def delta_e_cie2000(lab1, lab2):
+    """
+    Delta E between Lab colors of broadcastable shapes (..., 3).
+    Pass lab1[:, None] and lab2[None, :] to get the matrix of all pairs.
+    """
+    lab1 = np.asarray(lab1, dtype=float)
+    lab2 = np.asarray(lab2, dtype=float)
     # Extract components of Lab1 and Lab2
-    L1, a1, b1 = lab1.lab_l, lab1.lab_a, lab1.lab_b
-    L2, a2, b2 = lab2.lab_l, lab2.lab_a, lab2.lab_b
-    
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
     # 1. Calculate differences in lightness (L*)
     delta_L = L1 - L2
-    
+
     # 2. Calculate chroma for both colors
     C1 = np.sqrt(a1**2 + b1**2)
     C2 = np.sqrt(a2**2 + b2**2)
-    
+
     # 3. Calculate differences in chroma (C*)
     delta_C = C1 - C2
-    
+
     # 4. Calculate hue for both colors
     h1 = np.arctan2(b1, a1)  # Hue of color 1
     h2 = np.arctan2(b2, a2)  # Hue of color 2
-    
+
     # Ensure the hue difference is calculated in the range [0, 360)
     delta_H = h1 - h2
-    if delta_H < 0:
-        delta_H += 2 * np.pi  # Wrap around 360°
-    if delta_H > np.pi:
-        delta_H -= 2 * np.pi
-    
+    delta_H = np.where(delta_H < 0, delta_H + 2 * np.pi, delta_H)  # Wrap around 360°
+    delta_H = np.where(delta_H > np.pi, delta_H - 2 * np.pi, delta_H)
+
     # 5. Calculate the Hue difference (ΔH*)
     delta_H_star = 2 * np.sqrt(C1 * C2) * np.sin(delta_H / 2)
-    
+
     # 6. Calculate the rotation term R_T
     delta_theta = h1 - h2 + np.radians(30)
     R_T = -0.17 * np.cos(delta_theta) + 0.24 * np.cos(2 * h1 + np.radians(60)) \
           - 0.32 * np.cos(3 * h1 + np.radians(120)) + 0.2 * np.cos(4 * h1 - np.radians(63))
-    
+
     # 7. Calculate the final Delta E (CIE 2000)
     term1 = delta_L**2
     term2 = delta_C**2
     term3 = delta_H_star**2
     term4 = R_T * delta_C * delta_H_star
-    
-    delta_E_00 = np.sqrt(term1 + term2 + term3 + term4)
-    
+
+    # The rotation term can push the sum below zero, which yields nan
+    with np.errstate(invalid="ignore"):
+        delta_E_00 = np.sqrt(term1 + term2 + term3 + term4)
+
     return delta_E_00
 
 
-def rgb_to_lab(rgb):
+def delta_e_to_similarity(delta_e):
+    # Normalize the Delta E value to get a similarity score, where nan counts as 0 like max(0, nan) did
+    similarity = 1 - (delta_e / 100)
+    return np.where(similarity > 0, similarity, 0.0)
+
+
+def color_similarity_matrix_ciede2000(rgb_list1, rgb_list2):
+    """
+    Calculate the CIEDE2000 color similarity of every pair of RGB colors in the two lists.
+    Returns a (len(rgb_list1), len(rgb_list2)) matrix of scores between 0 and 1.
+    """
+    lab1 = rgb_to_lab(rgb_list1)
+    lab2 = rgb_to_lab(rgb_list2)
+    return delta_e_to_similarity(delta_e_cie2000(lab1[:, None], lab2[None, :]))
+
+
+def paired_color_similarity_ciede2000(rgb_list1, rgb_list2):
     """
-    Convert an RGB color to Lab color space.
-    RGB values should be in the range [0, 255].
+    Calculate the CIEDE2000 color similarity of rgb_list1[i] and rgb_list2[i] for every i.
     """
-    # Create an sRGBColor object from RGB values
-    rgb_color = sRGBColor(rgb[0], rgb[1], rgb[2], is_upscaled=True)
-    
-    # Convert to Lab color space
-    lab_color = convert_color(rgb_color, LabColor)
-    
-    return lab_color
+    lab1 = rgb_to_lab(rgb_list1)
+    lab2 = rgb_to_lab(rgb_list2)
+    return delta_e_to_similarity(delta_e_cie2000(lab1, lab2))
 
 
 def color_similarity_ciede2000(rgb1, rgb2):
@@ -68,13 +130,4 @@ def color_similarity_ciede2000(rgb1, rgb2):
     Calculate the color similarity between two RGB colors using the CIEDE2000 formula.
     Returns a similarity score between 0 and 1, where 1 means identical.
     """
-    # Convert RGB colors to Lab
-    lab1 = rgb_to_lab(rgb1)
-    lab2 = rgb_to_lab(rgb2)
-    
-    # Calculate the Delta E (CIEDE2000)
-    delta_e = delta_e_cie2000(lab1, lab2)
-    
-    # Normalize the Delta E value to get a similarity score
-    similarity = max(0, 1 - (delta_e / 100))
-    return similarity
\ No newline at end of file
+    return float(paired_color_similarity_ciede2000([rgb1[:3]], [rgb2[:3]])[0])
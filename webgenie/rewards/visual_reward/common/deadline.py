@@ -0,0 +1,48 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+class DeadlineExceeded(BaseException):
+    """
+    Raised when a scoring stage runs past its deadline. Like asyncio.CancelledError it is
+    not an Exception, so the scorers' `except Exception` fallbacks cannot swallow it.
+    """
+
+    def __init__(self, stage: str):
+        super().__init__(f"{stage} deadline exceeded")
+        self.stage = stage
+
+
+class Deadline:
+    def __init__(self, stage: str, timeout: float):
+        self.stage = stage
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0)
+
+    def check(self):
+        if time.monotonic() >= self.expires_at:
+            raise DeadlineExceeded(self.stage)
+
+
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(stage: str, timeout: float):
+    """Make the code in the block stop at the next `check_deadline` once `timeout` seconds have passed."""
+    token = current_deadline.set(Deadline(stage, timeout))
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+
+def check_deadline():
+    """Cooperative cancellation point for long synchronous scoring loops."""
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline.check()
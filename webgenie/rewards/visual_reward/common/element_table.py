@@ -0,0 +1,153 @@
+import numpy as np
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+from webgenie.rewards.visual_reward.common.sift import EMPTY_DESCRIPTORS, EMPTY_KEYPOINTS, flatten_feature_sets
+
+# Every array a table holds, the per-element columns first
+ARRAY_COLUMNS = [
+    "boxes",
+    "colors",
+    "avg_colors",
+    "text_ids",
+    "placeholder_ids",
+    "type_codes",
+    "keypoints",
+    "descriptors",
+    "descriptor_offsets",
+]
+
+
+def intern_strings(values: List[str], strings: List[str]) -> np.ndarray:
+    """Ids of `values` in `strings`, appending the ones it does not hold yet."""
+    string_index = {string: i for i, string in enumerate(strings)}
+    ids = np.zeros(len(values), dtype=np.int32)
+    for k, value in enumerate(values):
+        i = string_index.get(value)
+        if i is None:
+            i = string_index[value] = len(strings)
+            strings.append(value)
+        ids[k] = i
+    return ids
+
+
+class ElementTable:
+    """
+    The elements of a page as NumPy columns, row i holding element i:
+
+    - boxes: (x, y, width, height) in pixels of a page of `size` (width, height)
+    - colors: text color, avg_colors: average color of the element on the screenshot
+    - text_ids, placeholder_ids, type_codes: text, input placeholder and input type, as ids
+      into `strings`. Id 0 is the empty string, and the tables of one page share `strings`.
+    - keypoints, descriptors: SIFT features of every element back to back, element i
+      owning rows descriptor_offsets[i]:descriptor_offsets[i + 1]
+    """
+
+    def __init__(
+        self,
+        strings: Optional[List[str]] = None,
+        size: Tuple[float, float] = (1.0, 1.0),
+        boxes: Optional[np.ndarray] = None,
+        colors: Optional[np.ndarray] = None,
+        avg_colors: Optional[np.ndarray] = None,
+        text_ids: Optional[np.ndarray] = None,
+        placeholder_ids: Optional[np.ndarray] = None,
+        type_codes: Optional[np.ndarray] = None,
+        keypoints: Optional[np.ndarray] = None,
+        descriptors: Optional[np.ndarray] = None,
+        descriptor_offsets: Optional[np.ndarray] = None,
+    ):
+        self.strings = [""] if strings is None else strings
+        self.size = size
+        self.boxes = np.zeros((0, 4), dtype=np.float32) if boxes is None else np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        count = len(self.boxes)
+        self.colors = np.zeros((count, 3), dtype=np.uint8) if colors is None else np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        self.avg_colors = np.zeros((count, 3), dtype=np.float32) if avg_colors is None else np.asarray(avg_colors, dtype=np.float32).reshape(-1, 3)
+        self.text_ids = np.zeros(count, dtype=np.int32) if text_ids is None else np.asarray(text_ids, dtype=np.int32)
+        self.placeholder_ids = np.zeros(count, dtype=np.int32) if placeholder_ids is None else np.asarray(placeholder_ids, dtype=np.int32)
+        self.type_codes = np.zeros(count, dtype=np.int32) if type_codes is None else np.asarray(type_codes, dtype=np.int32)
+        self.keypoints = EMPTY_KEYPOINTS if keypoints is None else keypoints
+        self.descriptors = EMPTY_DESCRIPTORS if descriptors is None else descriptors
+        self.descriptor_offsets = np.zeros(count + 1, dtype=np.int64) if descriptor_offsets is None else descriptor_offsets
+
+    @classmethod
+    def from_elements(cls, elements: list) -> "ElementTable":
+        """A table of HTMLElements, positioned by their scaled bounding boxes on a page of size 1."""
+        strings = [""]
+        table = cls(
+            strings=strings,
+            boxes=[
+                [element.scaled_bounding_box.get(key, 0) for key in ("x", "y", "width", "height")]
+                for element in elements
+            ],
+            colors=[element.color for element in elements],
+            avg_colors=[np.asarray(element.avg_color, dtype=float)[:3] for element in elements],
+            text_ids=intern_strings([element.text for element in elements], strings),
+            placeholder_ids=intern_strings([element.input_placeholder for element in elements], strings),
+            type_codes=intern_strings([element.input_type for element in elements], strings),
+        )
+        table.set_features(
+            [element.keypoints if element.descriptors is not None else None for element in elements],
+            [element.descriptors for element in elements],
+        )
+        return table
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __getstate__(self):
+        # Cached columns are cheaper to recompute than to send to another process
+        return {name: getattr(self, name) for name in ["strings", "size"] + ARRAY_COLUMNS}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    @cached_property
+    def scaled_boxes(self) -> np.ndarray:
+        width, height = self.size
+        return self.boxes.astype(np.float64) / np.array([width, height, width, height], dtype=np.float64)
+
+    @cached_property
+    def string_index(self) -> dict:
+        return {string: i for i, string in enumerate(self.strings)}
+
+    @property
+    def texts(self) -> List[str]:
+        return [self.strings[i] for i in self.text_ids]
+
+    @property
+    def descriptor_counts(self) -> np.ndarray:
+        return np.diff(self.descriptor_offsets)
+
+    def ids_in(self, ids: np.ndarray, other: "ElementTable") -> np.ndarray:
+        """The strings of `ids` as ids into other.strings, -1 for the ones it does not hold."""
+        if self.strings is other.strings:
+            return ids
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        translated = np.array([other.string_index.get(self.strings[i], -1) for i in unique_ids], dtype=np.int32)
+        return translated[inverse.reshape(-1)]
+
+    def set_features(self, keypoints: list, descriptors: list):
+        """Store the SIFT features of every element, None for an element without any."""
+        self.keypoints, _ = flatten_feature_sets(keypoints, EMPTY_KEYPOINTS)
+        self.descriptors, self.descriptor_offsets = flatten_feature_sets(descriptors)
+
+    def take(self, indices: np.ndarray) -> "ElementTable":
+        """The rows at `indices`, sharing this table's strings."""
+        indices = np.asarray(indices, dtype=int)
+        counts = self.descriptor_counts[indices]
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        feature_rows = np.arange(offsets[-1]) + np.repeat(self.descriptor_offsets[indices] - offsets[:-1], counts)
+        return ElementTable(
+            strings=self.strings,
+            size=self.size,
+            boxes=self.boxes[indices],
+            colors=self.colors[indices],
+            avg_colors=self.avg_colors[indices],
+            text_ids=self.text_ids[indices],
+            placeholder_ids=self.placeholder_ids[indices],
+            type_codes=self.type_codes[indices],
+            keypoints=self.keypoints[feature_rows],
+            descriptors=self.descriptors[feature_rows],
+            descriptor_offsets=offsets,
+        )
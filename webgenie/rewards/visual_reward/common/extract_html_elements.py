@@ -5,17 +5,19 @@ import numpy as np
 from PIL import Image
 from pydantic import BaseModel, Field
 from typing import Any
-from skimage import io, color
 
 from webgenie.constants import (
     DEFAULT_LOAD_TIME, 
     CHROME_HTML_LOAD_TIME,
-    JAVASCRIPT_RUNNING_TIME,
 )
-from webgenie.rewards.visual_reward.common.browser import web_player
-from webgenie.rewards.visual_reward.common.sift import extract_sift_from_roi
+from webgenie.helpers.settle import wait_for_settled
+from webgenie.rewards.visual_reward.common.browser import browser_pool
+from webgenie.rewards.visual_reward.common.element_table import ElementTable, intern_strings
+from webgenie.rewards.visual_reward.common.screenshot import capture_screenshot
+from webgenie.rewards.visual_reward.common.sift import extract_sift_from_rois
 
 
+# A single element, as compared by the pairwise functions of similarity.py
 class HTMLElement(BaseModel):
     text: str = Field(default="")
     bounding_box: dict = Field(default={})
@@ -48,140 +50,141 @@ def parse_rgb_string(rgb_str: str) -> tuple[int, int, int]:
         return (0, 0, 0)
 
 
+# Walks the DOM in the same order as a Python-side stack traversal and returns one record per
+# rendered HTML element, so the whole page is captured in a single round trip. Text, color and
+# input attributes are only read for the elements that use them.
+EXTRACT_ELEMENTS_SCRIPT = """
+    () => {
+        const records = [];
+        if (!document.body) {
+            return records;
+        }
+        const stack = [document.body];
+        while (stack.length > 0) {
+            const el = stack.pop();
+            const children = el.children;
+            for (const child of children) {
+                stack.push(child);
+            }
+            if (!(el instanceof HTMLElement)) {
+                continue;
+            }
+            const rect = el.getBoundingClientRect();
+            if (rect.width <= 0 || rect.height <= 0) {
+                continue;
+            }
+            const tagName = el.tagName.toLowerCase();
+            const hasChildren = children.length > 0;
+            const isControl = tagName === 'button' || tagName === 'input' || tagName === 'a';
+            if (!isControl && hasChildren) {
+                continue;
+            }
+            const record = {
+                tagName: tagName,
+                hasChildren: hasChildren,
+                text: el.innerText,
+                x: rect.x,
+                y: rect.y,
+                width: rect.width,
+                height: rect.height,
+            };
+            if (!hasChildren) {
+                record.color = window.getComputedStyle(el).color || 'rgb(0, 0, 0)';
+            }
+            if (tagName === 'input') {
+                record.type = el.getAttribute('type') || 'text';
+                record.placeholder = el.getAttribute('placeholder') || '';
+            }
+            records.push(record);
+        }
+        return records;
+    }
+"""
+
+
+async def extract_elements_from_page(page, width, height):
+    """
+    Collect the text, button, input and anchor elements of an already loaded page,
+    as tables sharing one set of interned strings.
+    """
+    records = await page.evaluate(EXTRACT_ELEMENTS_SCRIPT)
+
+    strings = [""]
+    table = ElementTable(
+        strings=strings,
+        size=(width, height),
+        boxes=[[record["x"], record["y"], record["width"], record["height"]] for record in records],
+        colors=[parse_rgb_string(record["color"]) if "color" in record else (0, 0, 0) for record in records],
+        text_ids=intern_strings([record["text"] or "" for record in records], strings),
+        # Only inputs carry a type and a placeholder
+        placeholder_ids=intern_strings([record.get("placeholder", "") for record in records], strings),
+        type_codes=intern_strings([record.get("type", "") for record in records], strings),
+    )
+
+    tag_names = np.array([record["tagName"] for record in records], dtype=object)
+    has_children = np.array([record["hasChildren"] for record in records], dtype=bool)
+
+    # Text elements are the elements without children
+    text_elements = table.take(np.nonzero(~has_children)[0])
+    button_elements = table.take(np.nonzero(tag_names == "button")[0])
+    input_elements = table.take(np.nonzero(tag_names == "input")[0])
+    anchor_elements = table.take(np.nonzero(tag_names == "a")[0])
+    return text_elements, button_elements, input_elements, anchor_elements
+
+
 async def extract_html_elements(file_path, load_time = DEFAULT_LOAD_TIME):
     if os.path.exists(file_path):
         url = f"file:///{os.path.abspath(file_path)}"
 
-    screenshot_path = file_path.replace(".html", ".png")
-
-    text_elements = []
-    button_elements = []
-    input_elements = []
-    anchor_elements = []        
+    text_elements = ElementTable()
+    button_elements = ElementTable()
+    input_elements = ElementTable()
+    anchor_elements = ElementTable()
     try:
-        page = await web_player["browser"].new_page()
+        async with browser_pool.page() as page:
+            await page.goto(url, timeout=CHROME_HTML_LOAD_TIME)
 
-        await page.goto(url, timeout=CHROME_HTML_LOAD_TIME)
-
-        await page.wait_for_load_state("networkidle")
-        await page.wait_for_timeout(JAVASCRIPT_RUNNING_TIME)
+            settle_time = await wait_for_settled(page)
+            bt.logging.debug(f"Page {url} settled in {settle_time:.0f} ms")
         
-        if not os.path.exists(screenshot_path):
-            await page.screenshot(
-                path=screenshot_path, 
-                full_page=True, 
-                animations="disabled", 
-                timeout=CHROME_HTML_LOAD_TIME,
-            )
-            
-        with open(screenshot_path, "rb") as f:
-            screenshot = Image.open(f)
-            W, H = screenshot.size
-
-        async def add_element(node, has_children):
-            # Combine all necessary evaluations into one to reduce overhead
-            rendered_data = await node.evaluate("""
-                (el) => {
-                    const styles = window.getComputedStyle(el);
-                    const type = el.getAttribute('type') || 'text';
-                    const placeholder = el.getAttribute('placeholder') || '';
-                    return {
-                        tagName: el.tagName.toLowerCase(),
-                        color: styles.color || 'rgb(0, 0, 0)',
-                        type: type,
-                        placeholder: placeholder
-                    };
-                }
-            """)
-            
-            # Extract all relevant data from the evaluated result
-            text = await node.inner_text()
-            bounding_box = await node.bounding_box()
-            
-            # Early return if no bounding box or invalid dimensions
-            if bounding_box is None or bounding_box["width"] <= 0 or bounding_box["height"] <= 0:
-                return
-
-            scaled_bounding_box = {
-                "x": bounding_box["x"] / W,
-                "y": bounding_box["y"] / H,
-                "width": bounding_box["width"] / W,
-                "height": bounding_box["height"] / H
-            }
-
-            # Create the HTMLElement object with the extracted data
-            element_data = HTMLElement(
-                text=text, 
-                bounding_box=bounding_box, 
-                scaled_bounding_box=scaled_bounding_box,
-            )
-
-            # Add the element based on its tag name
-            if rendered_data['tagName'] == "button":
-                button_elements.append(element_data)
-            elif rendered_data['tagName'] == "input":
-                # Additional input-specific properties
-                element_data.input_type = rendered_data['type']
-                element_data.input_placeholder = rendered_data['placeholder']
-                input_elements.append(element_data)
-            elif rendered_data['tagName'] == "a":
-                anchor_elements.append(element_data)
-
-            # Add to text elements only if no children
-            if not has_children:
-                text_elements.append(
-                    HTMLElement(
-                        text=text, 
-                        bounding_box=bounding_box, 
-                        scaled_bounding_box=scaled_bounding_box,
-                        color=parse_rgb_string(rendered_data['color']),
-                    )
-                )
-                    
-        async def traverse(node):
-            stack = [node]
-            while stack:
-                current_node = stack.pop()
-                children = await current_node.query_selector_all(':scope > *')
-                for child in children:
-                    stack.append(child)
-                try:
-                    await add_element(current_node, bool(children))
-                except Exception as e:
-                    #bt.logging.warning(f"Error adding element: {e}")
-                    pass
-                # Dispose the node when done
-                await current_node.dispose()
-            
-        await traverse(await page.query_selector('body'))
-        await page.close()
-        preprocess_html_elements(file_path, button_elements)
-        preprocess_html_elements(file_path, input_elements)
-        preprocess_html_elements(file_path, anchor_elements)    
+            screenshot = await capture_screenshot(page)
+
+            (
+                text_elements,
+                button_elements,
+                input_elements,
+                anchor_elements,
+            ) = await extract_elements_from_page(page, screenshot.width, screenshot.height)
+        preprocess_html_elements(screenshot, [button_elements, input_elements, anchor_elements])
     except Exception as e:
         bt.logging.error(f"Error extracting html elements from {file_path}: {e}")
     return text_elements, button_elements, input_elements, anchor_elements
 
 
-def preprocess_html_elements(html_path, html_elements):
-    image_path = html_path.replace(".html", ".png")
-    color_image = io.imread(image_path)
-    for element in html_elements:
-        bbox = element.bounding_box
-        x, y, w, h = int(bbox["x"]), int(bbox["y"]), int(bbox["width"]), int(bbox["height"]) 
-        try:
-            element.avg_color = np.mean(color_image[y:y+h, x:x+w], axis=(0, 1))
-        except Exception as e:
-            #bt.logging.warning(f"Error calculating avg color of html elements from {html_path}: {e}")
-            element.avg_color = (0, 0, 0)
-
-    gray_image = color.rgb2gray(color_image)
-    for element in html_elements:
-        bbox = element.bounding_box
-        x, y, w, h = int(bbox["x"]), int(bbox["y"]), int(bbox["width"]), int(bbox["height"])
-        try:
-            element.keypoints, element.descriptors = extract_sift_from_roi(gray_image, (x, y, w, h))   
-        except Exception as e:
-            #bt.logging.warning(f"Error extracting sift from html elements from {html_path}: {e}")
-            element.keypoints = None
-            element.descriptors = None
+def preprocess_html_elements(screenshot, element_tables):
+    """Average colors and SIFT features of the elements of every table, in one pass over the screenshot."""
+    color_image = screenshot.rgb
+    rois = []
+    for table in element_tables:
+        for i, (x, y, w, h) in enumerate(table.boxes):
+            x, y, w, h = int(x), int(y), int(w), int(h)
+            try:
+                table.avg_colors[i] = np.mean(color_image[y:y+h, x:x+w], axis=(0, 1))
+            except Exception as e:
+                #bt.logging.warning(f"Error calculating avg color of html elements: {e}")
+                table.avg_colors[i] = (0, 0, 0)
+            rois.append((x, y, w, h))
+
+    try:
+        features = extract_sift_from_rois(screenshot.gray, rois)
+    except Exception as e:
+        #bt.logging.warning(f"Error extracting sift from html elements: {e}")
+        features = [(None, None)] * len(rois)
+    start = 0
+    for table in element_tables:
+        table_features = features[start : start + len(table)]
+        table.set_features(
+            [keypoints for keypoints, _ in table_features],
+            [descriptors for _, descriptors in table_features],
+        )
+        start += len(table)
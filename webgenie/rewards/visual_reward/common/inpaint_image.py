@@ -2,10 +2,14 @@ import uuid
 
 from bs4 import BeautifulSoup
 
-from webgenie.constants import DEFAULT_LOAD_TIME, HTML_EXTENSION
+from webgenie.constants import DEFAULT_LOAD_TIME, HTML_EXTENSION, INPAINT_MODE
 from webgenie.rewards.visual_reward.common.take_screenshot import take_screenshot
 
 
+# Tags whose text is erased before the layout is compared
+TEXT_TAGS = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div', 'span', 'a', 'b', 'li', 'table', 'td', 'th', 'button', 'footer', 'header', 'figcaption', 'label']  # Add more tags as needed
+
+
 def erase_texts(input_file_path, output_file_path):
     # Read the input HTML file
     with open(input_file_path, 'r') as file:
@@ -21,8 +25,7 @@ def erase_texts(input_file_path, output_file_path):
         element['style'] = '; '.join(updated_styles).strip()
 
     # Assign a unique color to text within each text-containing element
-    text_tags = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div', 'span', 'a', 'b', 'li', 'table', 'td', 'th', 'button', 'footer', 'header', 'figcaption', 'label']  # Add more tags as needed
-    for tag in soup.find_all(text_tags):
+    for tag in soup.find_all(TEXT_TAGS):
         update_style(tag, 'color', 'transparent')
         
     # Write the modified HTML to a new file
@@ -30,8 +33,19 @@ def erase_texts(input_file_path, output_file_path):
         file.write(str(soup))
 
 
-async def inpaint_image(url, output_file_path, load_time = DEFAULT_LOAD_TIME):
-    erased_html_path = f'{url.replace(HTML_EXTENSION, "_erased.html")}'
-    erase_texts(url, erased_html_path)
-    await take_screenshot(erased_html_path, output_file_path, load_time)
+async def erase_texts_on_page(page):
+    # Same effect as erase_texts on an already loaded page, without reparsing and reloading the html
+    selector = ", ".join(TEXT_TAGS)
+    await page.add_style_tag(content=f"{selector} {{ color: transparent !important; }}")
+
+
+async def inpaint_image(url, output_file_path, load_time = DEFAULT_LOAD_TIME, mode = INPAINT_MODE):
+    if mode == "css":
+        await take_screenshot(url, output_file_path, load_time, prepare_page=erase_texts_on_page)
+    elif mode == "rewrite":
+        erased_html_path = f'{url.replace(HTML_EXTENSION, "_erased.html")}'
+        erase_texts(url, erased_html_path)
+        await take_screenshot(erased_html_path, output_file_path, load_time)
+    else:
+        raise ValueError(f"Unknown inpaint mode: {mode}")
 
@@ -0,0 +1,122 @@
+import asyncio
+import bittensor as bt
+import os
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Optional
+
+from webgenie.constants import (
+    CHROME_HTML_LOAD_TIME,
+    SCREENSHOT_CAPTURE_MODE,
+    INPAINT_MODE,
+    RENDER_STAGE_TIMEOUT,
+    EXTRACTION_STAGE_TIMEOUT,
+)
+from webgenie.helpers.settle import wait_for_settled
+from webgenie.rewards.visual_reward.common.browser import browser_pool
+from webgenie.rewards.visual_reward.common.deadline import DeadlineExceeded, deadline_scope
+from webgenie.rewards.visual_reward.common.element_table import ElementTable
+from webgenie.rewards.visual_reward.common.extract_html_elements import (
+    extract_elements_from_page,
+    preprocess_html_elements,
+)
+from webgenie.rewards.visual_reward.common.inpaint_image import erase_texts, erase_texts_on_page
+from webgenie.rewards.visual_reward.common.screenshot import Screenshot, capture_screenshot
+
+
+class RenderArtifact(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    html_path: str = Field(default="", description="The rendered html file")
+    screenshot: Optional[Screenshot] = Field(default=None, description="The full page screenshot")
+    inpainted_screenshot: Optional[Screenshot] = Field(default=None, description="The full page screenshot with texts erased")
+    text_elements: ElementTable = Field(default_factory=ElementTable)
+    button_elements: ElementTable = Field(default_factory=ElementTable)
+    input_elements: ElementTable = Field(default_factory=ElementTable)
+    anchor_elements: ElementTable = Field(default_factory=ElementTable)
+    settle_time: float = Field(default=0.0, description="Milliseconds the page needed to settle after loading")
+    clip_embedding: Optional[Any] = Field(default=None, description="Precomputed CLIP embedding of the inpainted screenshot")
+    histogram: Optional[Any] = Field(default=None, description="Precomputed grayscale histogram of the screenshot")
+
+
+INPAINT_MODES = ("css", "rewrite")
+
+
+async def render_page(artifact: RenderArtifact, url: str, capture_mode: str, intercept_assets: bool, inpaint_mode: str):
+    async with browser_pool.page(intercept_assets) as page:
+        await page.goto(url, timeout=CHROME_HTML_LOAD_TIME)
+
+        artifact.settle_time = await wait_for_settled(page)
+        bt.logging.debug(f"Rendered {artifact.html_path}, settled in {artifact.settle_time:.0f} ms")
+
+        # Screenshots stay in memory and are decoded once for every scorer
+        artifact.screenshot = await capture_screenshot(page, capture_mode)
+
+        # Elements must be extracted before the texts are erased, as they carry the text color
+        (
+            artifact.text_elements,
+            artifact.button_elements,
+            artifact.input_elements,
+            artifact.anchor_elements,
+        ) = await extract_elements_from_page(page, artifact.screenshot.width, artifact.screenshot.height)
+
+        if inpaint_mode == "css":
+            await erase_texts_on_page(page)
+            artifact.inpainted_screenshot = await capture_screenshot(page, capture_mode)
+            return
+
+        # Reload the page with the texts erased in the html itself
+        erased_html_path = f"{os.path.splitext(artifact.html_path)[0]}_erased.html"
+        erase_texts(artifact.html_path, erased_html_path)
+        try:
+            await page.goto(f"file:///{os.path.abspath(erased_html_path)}", timeout=CHROME_HTML_LOAD_TIME)
+            await wait_for_settled(page)
+            artifact.inpainted_screenshot = await capture_screenshot(page, capture_mode)
+        finally:
+            os.remove(erased_html_path)
+
+
+async def render_html_artifact(
+    html_path: str,
+    capture_mode: str = SCREENSHOT_CAPTURE_MODE,
+    render_timeout: float = RENDER_STAGE_TIMEOUT,
+    extraction_timeout: float = EXTRACTION_STAGE_TIMEOUT,
+    intercept_assets: bool = True,
+    inpaint_mode: str = INPAINT_MODE,
+) -> RenderArtifact:
+    """
+    Load the html once and produce everything the visual scorers need from it:
+    the full page screenshot, the text-erased screenshot and the extracted elements.
+    Raises DeadlineExceeded when the render or the extraction stage runs out of time.
+    Ground truth renders pass intercept_assets=False to load their resources from the network.
+    inpaint_mode "css" erases the texts with a stylesheet on the loaded page, "rewrite" reloads
+    the html with the texts erased in its markup.
+    """
+    if inpaint_mode not in INPAINT_MODES:
+        raise ValueError(f"Unknown inpaint mode: {inpaint_mode}")
+    url = f"file:///{os.path.abspath(html_path)}"
+    artifact = RenderArtifact(html_path=html_path)
+
+    try:
+        # Cancelling the render closes its page instead of handing it back to the pool
+        await asyncio.wait_for(render_page(artifact, url, capture_mode, intercept_assets, inpaint_mode), timeout=render_timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("render")
+    except Exception as e:
+        bt.logging.error(f"Failed to render {html_path} due to: {e}. Generating blank images.")
+        # Generate blank images
+        if artifact.screenshot is None:
+            artifact.screenshot = Screenshot.blank()
+        if artifact.inpainted_screenshot is None:
+            artifact.inpainted_screenshot = Screenshot.blank()
+
+    with deadline_scope("extraction", extraction_timeout):
+        try:
+            # One pass over the screenshot serves every element list
+            preprocess_html_elements(
+                artifact.screenshot,
+                [artifact.button_elements, artifact.input_elements, artifact.anchor_elements],
+            )
+        except Exception as e:
+            bt.logging.error(f"Error preprocessing html elements from {html_path}: {e}")
+
+    return artifact
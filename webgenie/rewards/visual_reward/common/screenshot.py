@@ -0,0 +1,157 @@
+import base64
+import math
+import numpy as np
+from functools import cached_property
+from io import BytesIO
+from PIL import Image
+
+from webgenie.constants import (
+    CHROME_HTML_LOAD_TIME,
+    SCREENSHOT_CAPTURE_MODE,
+    CDP_CAPTURE_TILE_HEIGHT,
+)
+from webgenie.rewards.visual_reward.common.sift import rgb_to_gray
+
+# What Playwright does for animations="disabled": finite animations jump to their end, infinite ones are cancelled
+DISABLE_ANIMATIONS_SCRIPT = """
+() => {
+    for (const animation of document.getAnimations()) {
+        const timing = animation.effect ? animation.effect.getComputedTiming() : null;
+        if (timing && Number.isFinite(timing.endTime)) {
+            animation.finish();
+        } else {
+            animation.cancel();
+        }
+    }
+}
+"""
+
+
+class Screenshot:
+    """
+    A screenshot decoded once into a uint8 RGB array, shared by reference by every
+    scoring stage. The derived images and reduced levels are computed on first use.
+    """
+
+    def __init__(self, rgb: np.ndarray):
+        self.rgb = rgb
+        self._levels = {}
+
+    def __getstate__(self):
+        # Derived images are cheaper to recompute than to send to another process
+        return {"rgb": self.rgb}
+
+    def __setstate__(self, state):
+        self.rgb = state["rgb"]
+        self._levels = {}
+
+    @classmethod
+    def from_bytes(cls, image_bytes: bytes) -> "Screenshot":
+        with Image.open(BytesIO(image_bytes)) as image:
+            return cls(np.asarray(image.convert("RGB")))
+
+    @classmethod
+    def from_file(cls, image_path: str) -> "Screenshot":
+        with Image.open(image_path) as image:
+            return cls(np.asarray(image.convert("RGB")))
+
+    @classmethod
+    def blank(cls, width: int = 1280, height: int = 960) -> "Screenshot":
+        return cls(np.full((height, width, 3), 255, dtype=np.uint8))
+
+    @property
+    def width(self) -> int:
+        return self.rgb.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.rgb.shape[0]
+
+    @cached_property
+    def gray(self) -> np.ndarray:
+        # float32 grayscale in [0, 1] for SIFT
+        return rgb_to_gray(self.rgb)
+
+    @cached_property
+    def luminance(self) -> np.ndarray:
+        # Same integer formula as PIL's convert("L")
+        rgb = self.rgb.astype(np.uint32)
+        return ((rgb[..., 0] * 19595 + rgb[..., 1] * 38470 + rgb[..., 2] * 7471 + 0x8000) >> 16).astype(np.uint8)
+
+    def to_image(self) -> Image.Image:
+        return Image.fromarray(self.rgb)
+
+    def reduction_factors(self, min_size: int) -> tuple[int, int]:
+        # The largest factors that keep both sides at least min_size, tall pages shrink the most along their height
+        return max(self.width // min_size, 1), max(self.height // min_size, 1)
+
+    def reduced(self, min_size: int) -> "Screenshot":
+        """
+        A level of the screenshot at least `min_size` pixels per side, each pixel averaging
+        its block of the full screenshot. Every level is made once per screenshot.
+        """
+        factors = self.reduction_factors(min_size)
+        if factors == (1, 1):
+            return self
+        key = ("reduced", factors)
+        if key not in self._levels:
+            self._levels[key] = Screenshot(np.asarray(self.to_image().reduce(factors)))
+        return self._levels[key]
+
+    def subsampled(self, min_size: int) -> "Screenshot":
+        """
+        Like reduced, but keeping every n-th pixel instead of averaging them, so the pixel
+        values are distributed as in the full screenshot.
+        """
+        x_factor, y_factor = self.reduction_factors(min_size)
+        if (x_factor, y_factor) == (1, 1):
+            return self
+        key = ("subsampled", (x_factor, y_factor))
+        if key not in self._levels:
+            self._levels[key] = Screenshot(self.rgb[::y_factor, ::x_factor])
+        return self._levels[key]
+
+
+async def capture_screenshot(page, mode: str = SCREENSHOT_CAPTURE_MODE) -> Screenshot:
+    """
+    Capture the full page, either as one Playwright png or, in "cdp" mode, as tiles of
+    speed-optimized pngs from Page.captureScreenshot stitched into one array.
+    """
+    if mode == "playwright":
+        return Screenshot.from_bytes(
+            await page.screenshot(
+                full_page=True,
+                animations="disabled",
+                timeout=CHROME_HTML_LOAD_TIME,
+            )
+        )
+    if mode != "cdp":
+        raise ValueError(f"Unknown screenshot capture mode: {mode}")
+
+    await page.evaluate(DISABLE_ANIMATIONS_SCRIPT)
+    session = await page.context.new_cdp_session(page)
+    try:
+        metrics = await session.send("Page.getLayoutMetrics")
+        content_size = metrics["cssContentSize"]
+        width = math.ceil(content_size["width"])
+        height = math.ceil(content_size["height"])
+
+        tiles = []
+        for top in range(0, height, CDP_CAPTURE_TILE_HEIGHT):
+            result = await session.send("Page.captureScreenshot", {
+                "format": "png",
+                "optimizeForSpeed": True,
+                "captureBeyondViewport": True,
+                "clip": {
+                    "x": 0,
+                    "y": top,
+                    "width": width,
+                    "height": min(CDP_CAPTURE_TILE_HEIGHT, height - top),
+                    "scale": 1,
+                },
+            })
+            tiles.append(Screenshot.from_bytes(base64.b64decode(result["data"])).rgb)
+    finally:
+        await session.detach()
+
+    return Screenshot(np.concatenate(tiles, axis=0))
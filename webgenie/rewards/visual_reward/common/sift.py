@@ -1,43 +1,289 @@
-import numpy as np
-from skimage import io, color
-from skimage.feature import SIFT
-from scipy.spatial.distance import cdist
-from scipy.optimize import linear_sum_assignment
-
-
-def extract_sift_from_roi(gray_image, roi):
-    # ROI: (x, y, w, h)
-    x, y, w, h = roi
-    # Crop the image to that sub-region
-    roi_image = gray_image[y : y + h, x : x + w]
-
-    # Initialize SIFT
-    sift = SIFT()
-    sift.detect_and_extract(roi_image)
-
-    # SIFT keypoints are relative to the top-left of the ROI
-    keypoints = sift.keypoints
-    descriptors = sift.descriptors
-
-    return keypoints, descriptors
-
-
-def match_sift_features(kp1, desc1, kp2, desc2, distance_metric="euclidean", threshold=0.75):
-    if (desc1 is None or len(desc1) == 0) and (desc2 is None or len(desc2) == 0):
-        return 1
-    elif (desc1 is None or len(desc1) == 0) or (desc2 is None or len(desc2) == 0):
-        return 0
-
-    # Compute the pairwise distance matrix between descriptors
-    cost_matrix = cdist(desc1, desc2, metric=distance_metric)
-
-    # Solve the assignment problem
-    row_indices, col_indices = linear_sum_assignment(cost_matrix)
-
-    # Apply a threshold to filter out matches with large distances
-    matches = []
-    for i, j in zip(row_indices, col_indices):
-        if cost_matrix[i, j] < threshold:
-            matches.append((i, j))
-
-    return 1 - len(matches) / max(len(kp1), len(kp2))
+import numpy as np
+from skimage.feature import SIFT
+from scipy.spatial.distance import cdist
+from scipy.optimize import linear_sum_assignment
+
+from webgenie.constants import (
+    SIFT_TILE_HEIGHT,
+    SIFT_TILE_OVERLAP,
+    SIFT_ROI_CONTEXT,
+    SIFT_MAX_KEYPOINTS_PER_ROI,
+    SIFT_MATCHING_MODE,
+    SIFT_RATIO_TEST,
+)
+from webgenie.rewards.visual_reward.common.deadline import check_deadline
+
+# Same luminance weights as skimage.color.rgb2gray
+GRAY_WEIGHTS = np.array([0.2125, 0.7154, 0.0721], dtype=np.float32)
+
+# SIFT features of an image without any keypoints
+EMPTY_KEYPOINTS = np.zeros((0, 2), dtype=np.int64)
+EMPTY_DESCRIPTORS = np.zeros((0, 128), dtype=np.uint8)
+
+
+def rgb_to_gray(color_image):
+    # float32 is enough for SIFT and halves the memory of the scale space
+    rgb = np.asarray(color_image)[..., :3].astype(np.float32)
+    if np.issubdtype(np.asarray(color_image).dtype, np.integer):
+        rgb /= 255
+    return rgb @ GRAY_WEIGHTS
+
+
+def extract_sift_from_roi(gray_image, roi):
+    # ROI: (x, y, w, h)
+    x, y, w, h = roi
+    # Crop the image to that sub-region
+    roi_image = gray_image[y : y + h, x : x + w]
+
+    # Initialize SIFT
+    sift = SIFT()
+    sift.detect_and_extract(roi_image)
+
+    # SIFT keypoints are relative to the top-left of the ROI
+    keypoints = sift.keypoints
+    descriptors = sift.descriptors
+
+    return keypoints, descriptors
+
+
+def detect_sift_features(gray_image, tile_height=SIFT_TILE_HEIGHT, tile_overlap=SIFT_TILE_OVERLAP):
+    """
+    Run SIFT over the image, in overlapping horizontal tiles when it is tall.
+    Returns (row, col) keypoints, descriptors and keypoint sigmas.
+    """
+    height = gray_image.shape[0]
+    step = max(tile_height - tile_overlap, 1)
+    keypoints, descriptors, sigmas = [], [], []
+
+    start = 0
+    while start < height:
+        is_last = start + tile_height >= height
+        # Each tile owns the middle of its overlap with its neighbours
+        owned_start = 0 if start == 0 else start + tile_overlap // 2
+        owned_end = height if is_last else start + step + tile_overlap // 2
+
+        sift = SIFT()
+        try:
+            sift.detect_and_extract(gray_image[start : start + tile_height])
+            tile_keypoints = sift.keypoints + (start, 0)
+            owned = (tile_keypoints[:, 0] >= owned_start) & (tile_keypoints[:, 0] < owned_end)
+            keypoints.append(tile_keypoints[owned])
+            descriptors.append(sift.descriptors[owned])
+            sigmas.append(sift.sigmas[owned])
+        except Exception:
+            # SIFT raises when a tile has no features
+            pass
+
+        if is_last:
+            break
+        start += step
+
+    if not keypoints:
+        return EMPTY_KEYPOINTS, EMPTY_DESCRIPTORS, np.zeros(0)
+    return np.concatenate(keypoints), np.concatenate(descriptors), np.concatenate(sigmas)
+
+
+def merge_rois(rois, padding, shape):
+    """
+    Pad every ROI (x, y, w, h) and merge the ones that touch into disjoint
+    (x0, y0, x1, y1) regions clipped to the image.
+    """
+    height, width = shape[:2]
+    boxes = [
+        [max(x - padding, 0), max(y - padding, 0), min(x + w + padding, width), min(y + h + padding, height)]
+        for x, y, w, h in rois
+    ]
+    regions = []
+    for box in sorted(boxes, key=lambda box: box[1]):
+        if box[0] >= box[2] or box[1] >= box[3]:
+            continue
+        i = 0
+        while i < len(regions):
+            region = regions[i]
+            if region[0] < box[2] and box[0] < region[2] and region[1] < box[3] and box[1] < region[3]:
+                box = [min(region[0], box[0]), min(region[1], box[1]), max(region[2], box[2]), max(region[3], box[3])]
+                regions.pop(i)
+                # The grown box may now touch regions it missed before
+                i = 0
+            else:
+                i += 1
+        regions.append(box)
+    return regions
+
+
+def extract_sift_from_rois(gray_image, rois, context=SIFT_ROI_CONTEXT, max_keypoints=SIFT_MAX_KEYPOINTS_PER_ROI):
+    """
+    SIFT keypoints and descriptors of every ROI (x, y, w, h).
+
+    Overlapping ROIs, grown by `context` pixels, are merged into regions that are each
+    scanned once, and the keypoints are bucketed back into the ROIs. Keypoints
+    are relative to the top-left of their ROI, like extract_sift_from_roi.
+    """
+    if not rois:
+        return []
+
+    keypoints, descriptors, sigmas = [], [], []
+    for x0, y0, x1, y1 in merge_rois(rois, context, gray_image.shape):
+        check_deadline()
+        region_keypoints, region_descriptors, region_sigmas = detect_sift_features(gray_image[y0:y1, x0:x1])
+        keypoints.append(region_keypoints + (y0, x0))
+        descriptors.append(region_descriptors)
+        sigmas.append(region_sigmas)
+    if keypoints:
+        keypoints, descriptors, sigmas = np.concatenate(keypoints), np.concatenate(descriptors), np.concatenate(sigmas)
+    else:
+        keypoints, descriptors, sigmas = EMPTY_KEYPOINTS, EMPTY_DESCRIPTORS, np.zeros(0)
+
+    # Keypoints sorted by row, so each ROI only scans its own band of rows
+    order = np.argsort(keypoints[:, 0], kind="stable")
+    keypoints, descriptors, sigmas = keypoints[order], descriptors[order], sigmas[order]
+    rows = keypoints[:, 0]
+
+    features = []
+    for x, y, w, h in rois:
+        begin, end = np.searchsorted(rows, [y, y + h], side="left")
+        band = np.arange(begin, end)
+        inside = band[(keypoints[band, 1] >= x) & (keypoints[band, 1] < x + w)]
+        if len(inside) > max_keypoints:
+            # Coarser keypoints are the more stable ones
+            inside = np.sort(inside[np.argsort(-sigmas[inside], kind="stable")[:max_keypoints]])
+        features.append((keypoints[inside] - (y, x), descriptors[inside]))
+    return features
+
+
+def flatten_feature_sets(feature_sets, empty=EMPTY_DESCRIPTORS):
+    """
+    Stack per-element keypoints or descriptors, None for none, into one array where element i
+    owns rows offsets[i]:offsets[i + 1]. Returns the array and the offsets.
+    """
+    counts = [0 if features is None else len(features) for features in feature_sets]
+    nonempty = [np.asarray(features) for features, count in zip(feature_sets, counts) if count]
+    flat = np.concatenate(nonempty) if nonempty else empty
+    return flat, np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+
+def match_sift_features(kp1, desc1, kp2, desc2, distance_metric="euclidean", threshold=0.75):
+    if (desc1 is None or len(desc1) == 0) and (desc2 is None or len(desc2) == 0):
+        return 1
+    elif (desc1 is None or len(desc1) == 0) or (desc2 is None or len(desc2) == 0):
+        return 0
+
+    # Compute the pairwise distance matrix between descriptors
+    cost_matrix = cdist(desc1, desc2, metric=distance_metric)
+
+    # Solve the assignment problem
+    row_indices, col_indices = linear_sum_assignment(cost_matrix)
+
+    # Apply a threshold to filter out matches with large distances
+    matches = []
+    for i, j in zip(row_indices, col_indices):
+        if cost_matrix[i, j] < threshold:
+            matches.append((i, j))
+
+    return 1 - len(matches) / max(len(kp1), len(kp2))
+
+
+def count_sift_matches(cost_matrix, threshold, mode):
+    if mode == "assignment":
+        row_indices, col_indices = linear_sum_assignment(cost_matrix)
+        return np.count_nonzero(cost_matrix[row_indices, col_indices] < threshold)
+
+    rows = np.arange(len(cost_matrix))
+    nearest = cost_matrix.argmin(axis=1)
+    nearest_distances = cost_matrix[rows, nearest]
+    accepted = nearest_distances < threshold
+    if mode == "mutual_nn":
+        accepted &= cost_matrix.argmin(axis=0)[nearest] == rows
+    elif mode == "ratio":
+        if cost_matrix.shape[1] > 1:
+            second_distances = np.partition(cost_matrix, 1, axis=1)[:, 1]
+            accepted &= nearest_distances < SIFT_RATIO_TEST * second_distances
+    else:
+        raise ValueError(f"Unknown SIFT matching mode: {mode}")
+    return np.count_nonzero(accepted)
+
+
+def match_sift_feature_pairs(predicted_descriptors, original_descriptors, rows, cols, mode=SIFT_MATCHING_MODE, threshold=0.75):
+    """
+    match_sift_features of predicted_descriptors[rows[k]] and original_descriptors[cols[k]] for every k.
+
+    Each predicted set is compared against the stacked descriptors of all its paired original
+    sets at once, and pairs whose closest descriptors are already beyond `threshold` are settled
+    without matching. `mode` picks how matches are counted: "assignment" is the exact Hungarian
+    matching of match_sift_features, "mutual_nn" and "ratio" are the cheaper nearest neighbour tests.
+    """
+    predicted_descriptors, predicted_offsets = flatten_feature_sets(predicted_descriptors)
+    original_descriptors, original_offsets = flatten_feature_sets(original_descriptors)
+    return match_flat_sift_feature_pairs(
+        predicted_descriptors, predicted_offsets, original_descriptors, original_offsets, rows, cols, mode, threshold,
+    )
+
+
+def match_flat_sift_feature_pairs(
+    predicted_descriptors,
+    predicted_offsets,
+    original_descriptors,
+    original_offsets,
+    rows,
+    cols,
+    mode=SIFT_MATCHING_MODE,
+    threshold=0.75,
+):
+    """
+    match_sift_feature_pairs of descriptor sets stacked by flatten_feature_sets.
+    """
+    rows, cols = np.asarray(rows, dtype=int), np.asarray(cols, dtype=int)
+    predicted_counts = np.diff(predicted_offsets)
+    original_counts = np.diff(original_offsets)
+
+    # Two empty sets are identical, a single empty set matches nothing, and no matches below the threshold
+    similarity = np.where((predicted_counts[rows] == 0) & (original_counts[cols] == 0), 1.0, 0.0)
+    nonempty = (predicted_counts[rows] > 0) & (original_counts[cols] > 0)
+    similarity[nonempty] = 1.0
+    if not nonempty.any():
+        return similarity
+
+    stacked = np.asarray(original_descriptors, dtype=np.float64)
+    stacked_norms = (stacked ** 2).sum(axis=1)
+
+    pair_indices = np.nonzero(nonempty)[0]
+    pair_indices = pair_indices[np.argsort(rows[pair_indices], kind="stable")]
+    boundaries = np.nonzero(np.diff(rows[pair_indices]))[0] + 1
+    for group in np.split(pair_indices, boundaries):
+        check_deadline()
+        i = rows[group[0]]
+        descriptors = np.asarray(predicted_descriptors[predicted_offsets[i] : predicted_offsets[i + 1]], dtype=np.float64)
+        group_cols = cols[group]
+        segments = np.concatenate([[0], np.cumsum(original_counts[group_cols])])
+        # Rows of the stacked descriptors of every paired original set, back to back
+        columns = np.arange(segments[-1]) + np.repeat(original_offsets[group_cols] - segments[:-1], original_counts[group_cols])
+
+        if len(columns) == len(stacked) and np.array_equal(columns, np.arange(len(stacked))):
+            # Paired with every original set, as for a dense matrix
+            paired, paired_norms = stacked, stacked_norms
+        else:
+            paired, paired_norms = stacked[columns], stacked_norms[columns]
+        squared_distances = (descriptors ** 2).sum(axis=1)[:, None] + paired_norms[None, :] - 2 * descriptors @ paired.T
+        closest = np.minimum.reduceat(squared_distances.min(axis=0), segments[:-1])
+
+        # The expanded form is only used to prune, so leave it some rounding slack
+        for k in np.nonzero(closest < threshold ** 2 + 1e-6)[0]:
+            j = group_cols[k]
+            cost_matrix = cdist(descriptors, paired[segments[k] : segments[k + 1]])
+            matches = count_sift_matches(cost_matrix, threshold, mode)
+            similarity[group[k]] = 1 - matches / max(predicted_counts[i], original_counts[j])
+
+    return similarity
+
+
+def batch_match_sift_features(predicted_descriptors, original_descriptors, mask=None, mode=SIFT_MATCHING_MODE, threshold=0.75):
+    """
+    match_sift_features for every (predicted, original) pair of descriptor sets, see match_sift_feature_pairs.
+    """
+    n, m = len(predicted_descriptors), len(original_descriptors)
+    if mask is None:
+        mask = np.ones((n, m), dtype=bool)
+    rows, cols = np.nonzero(mask)
+    similarity = np.zeros((n, m))
+    similarity[rows, cols] = match_sift_feature_pairs(predicted_descriptors, original_descriptors, rows, cols, mode, threshold)
+    return similarity
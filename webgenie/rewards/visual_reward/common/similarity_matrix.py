@@ -0,0 +1,126 @@
+import numpy as np
+
+from webgenie.rewards.visual_reward.common.color_diff import (
+    color_similarity_matrix_ciede2000,
+    paired_color_similarity_ciede2000,
+)
+from webgenie.rewards.visual_reward.common.element_table import ElementTable
+from webgenie.rewards.visual_reward.common.sift import match_flat_sift_feature_pairs
+from webgenie.rewards.visual_reward.common.text_similarity import text_similarity, unique_text_similarity_matrix
+# Each matrix holds the similarity of predicted element i (rows) and original element j (columns).
+# The pairwise counterparts in similarity.py define the values; these build all pairs at once.
+
+
+def block_similarity(predicted_boxes: np.ndarray, original_boxes: np.ndarray) -> np.ndarray:
+    px, py, pw, ph = (predicted_boxes[..., k] for k in range(4))
+    ox, oy, ow, oh = (original_boxes[..., k] for k in range(4))
+
+    x_shift = np.abs(px - ox)
+    y_shift = np.abs(py - oy)
+    xx_shift = np.abs(px + pw - ox - ow)
+    yy_shift = np.abs(py + ph - oy - oh)
+
+    return 1 - (x_shift + y_shift + xx_shift + yy_shift) / 4
+
+
+def block_similarity_matrix(predicted_elements: ElementTable, original_elements: ElementTable) -> np.ndarray:
+    return block_similarity(predicted_elements.scaled_boxes[:, None, :], original_elements.scaled_boxes[None, :, :])
+
+
+def color_similarity_matrix(predicted_colors: np.ndarray, original_colors: np.ndarray) -> np.ndarray:
+    return color_similarity_matrix_ciede2000(predicted_colors.astype(float), original_colors.astype(float))
+
+
+def text_similarity_matrix(
+    predicted_elements: ElementTable,
+    original_elements: ElementTable,
+    column: str = "text_ids",
+    mask: np.ndarray = None,
+    threshold: float = 0.0,
+) -> np.ndarray:
+    """
+    Similarity of the interned strings in `column` of every (predicted, original) pair, see
+    text_similarity.text_similarity_matrix. Each distinct string is only compared once.
+    """
+    predicted_ids, predicted_inverse = np.unique(getattr(predicted_elements, column), return_inverse=True)
+    original_ids, original_inverse = np.unique(getattr(original_elements, column), return_inverse=True)
+    return unique_text_similarity_matrix(
+        [predicted_elements.strings[i] for i in predicted_ids],
+        predicted_inverse.reshape(-1),
+        [original_elements.strings[i] for i in original_ids],
+        original_inverse.reshape(-1),
+        mask,
+        threshold,
+    )
+
+
+def type_mask_matrix(predicted_elements: ElementTable, original_elements: ElementTable) -> np.ndarray:
+    predicted_types = predicted_elements.ids_in(predicted_elements.type_codes, original_elements)
+    return predicted_types[:, None] == original_elements.type_codes[None, :]
+
+
+def sift_similarity_matrix(predicted_elements: ElementTable, original_elements: ElementTable, mask: np.ndarray = None) -> np.ndarray:
+    n, m = len(predicted_elements), len(original_elements)
+    if mask is None:
+        mask = np.ones((n, m), dtype=bool)
+    rows, cols = np.nonzero(mask)
+    similarity = np.zeros((n, m))
+    similarity[rows, cols] = sift_similarity_pairs(predicted_elements, original_elements, rows, cols)
+    return similarity
+
+
+def visual_similarity_matrix(predicted_elements: ElementTable, original_elements: ElementTable, mask: np.ndarray = None) -> np.ndarray:
+    sift_similarity = sift_similarity_matrix(predicted_elements, original_elements, mask)
+    avg_color_similarity = color_similarity_matrix(predicted_elements.avg_colors, original_elements.avg_colors)
+    return sift_similarity * 0.5 + avg_color_similarity * 0.5
+
+
+# The pair versions score only the pairs (rows[k], cols[k]), for callers that skip most of the matrix.
+
+
+def block_similarity_pairs(predicted_elements: ElementTable, original_elements: ElementTable, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    return block_similarity(predicted_elements.scaled_boxes[rows], original_elements.scaled_boxes[cols])
+
+
+def color_similarity_pairs(predicted_colors: np.ndarray, original_colors: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    return paired_color_similarity_ciede2000(predicted_colors[rows].astype(float), original_colors[cols].astype(float))
+
+
+def text_similarity_pairs(
+    predicted_elements: ElementTable,
+    original_elements: ElementTable,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    column: str = "text_ids",
+) -> np.ndarray:
+    predicted_ids = getattr(predicted_elements, column)[rows]
+    original_ids = getattr(original_elements, column)[cols]
+    return np.array(
+        [
+            text_similarity(predicted_elements.strings[i], original_elements.strings[j])
+            for i, j in zip(predicted_ids, original_ids)
+        ],
+        dtype=float,
+    )
+
+
+def type_mask_pairs(predicted_elements: ElementTable, original_elements: ElementTable, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    predicted_types = predicted_elements.ids_in(predicted_elements.type_codes, original_elements)
+    return predicted_types[rows] == original_elements.type_codes[cols]
+
+
+def sift_similarity_pairs(predicted_elements: ElementTable, original_elements: ElementTable, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    return match_flat_sift_feature_pairs(
+        predicted_elements.descriptors,
+        predicted_elements.descriptor_offsets,
+        original_elements.descriptors,
+        original_elements.descriptor_offsets,
+        rows,
+        cols,
+    )
+
+
+def visual_similarity_pairs(predicted_elements: ElementTable, original_elements: ElementTable, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    sift_similarity = sift_similarity_pairs(predicted_elements, original_elements, rows, cols)
+    avg_color_similarity = color_similarity_pairs(predicted_elements.avg_colors, original_elements.avg_colors, rows, cols)
+    return sift_similarity * 0.5 + avg_color_similarity * 0.5
@@ -5,12 +5,12 @@ from PIL import Image
 from webgenie.constants import (
     DEFAULT_LOAD_TIME, 
     CHROME_HTML_LOAD_TIME, 
-    JAVASCRIPT_RUNNING_TIME,
 )
-from webgenie.rewards.visual_reward.common.browser import web_player
+from webgenie.helpers.settle import wait_for_settled
+from webgenie.rewards.visual_reward.common.browser import browser_pool
 
 
-async def take_screenshot(url, output_file_path, load_time = DEFAULT_LOAD_TIME, overwrite = False):
+async def take_screenshot(url, output_file_path, load_time = DEFAULT_LOAD_TIME, overwrite = False, prepare_page = None):
     if os.path.exists(url):
         url = f"file:///{os.path.abspath(url)}"
 
@@ -21,19 +21,21 @@ async def take_screenshot(url, output_file_path, load_time = DEFAULT_LOAD_TIME,
             os.remove(output_file_path)
         
     try:
-        page = await web_player["browser"].new_page()
-        await page.goto(url, timeout=CHROME_HTML_LOAD_TIME)
+        async with browser_pool.page() as page:
+            await page.goto(url, timeout=CHROME_HTML_LOAD_TIME)
 
-        await page.wait_for_load_state('networkidle')
-        await page.wait_for_timeout(JAVASCRIPT_RUNNING_TIME)
-        
-        await page.screenshot(
-            path=output_file_path, 
-            full_page=True, 
-            animations='disabled', 
-            timeout=CHROME_HTML_LOAD_TIME,
-        )
-        await page.close()
+            settle_time = await wait_for_settled(page)
+            bt.logging.debug(f"Page {url} settled in {settle_time:.0f} ms")
+
+            if prepare_page is not None:
+                await prepare_page(page)
+            
+            await page.screenshot(
+                path=output_file_path, 
+                full_page=True, 
+                animations='disabled', 
+                timeout=CHROME_HTML_LOAD_TIME,
+            )
     except Exception as e:
         bt.logging.error(f"Failed to take screenshot due to: {e}. Generating a blank image.")
         # Generate a blank image 
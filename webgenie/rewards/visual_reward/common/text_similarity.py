@@ -0,0 +1,123 @@
+import numpy as np
+from collections import Counter
+from functools import lru_cache
+from typing import List
+
+try:
+    # Compiled port of difflib with identical results
+    from cydifflib import SequenceMatcher
+except ImportError:
+    from difflib import SequenceMatcher
+
+from webgenie.constants import TEXT_RATIO_CACHE_SIZE
+
+
+@lru_cache(maxsize=TEXT_RATIO_CACHE_SIZE)
+def text_ratio(text1: str, text2: str) -> float:
+    return SequenceMatcher(None, text1, text2).ratio()
+
+
+@lru_cache(maxsize=TEXT_RATIO_CACHE_SIZE)
+def char_counts(text: str) -> Counter:
+    return Counter(text)
+
+
+def text_ratio_upper_bound(text1: str, text2: str) -> float:
+    # Same bound as SequenceMatcher.quick_ratio: no alignment matches more characters than both texts share
+    counts1, counts2 = char_counts(text1), char_counts(text2)
+    if len(counts1) > len(counts2):
+        counts1, counts2 = counts2, counts1
+    matches = sum(min(count, counts2[char]) for char, count in counts1.items())
+    return 2.0 * matches / (len(text1) + len(text2))
+
+
+def text_similarity(text1: str, text2: str) -> float:
+    if not text1 and not text2:
+        return 1
+    if not text1 or not text2:
+        return 0
+    if text1 == text2:
+        return 1.0
+    return text_ratio(text1, text2)
+
+
+def text_similarity_matrix(
+    predicted_texts: List[str],
+    original_texts: List[str],
+    mask: np.ndarray = None,
+    threshold: float = 0.0,
+) -> np.ndarray:
+    """
+    SequenceMatcher ratio of every (predicted, original) text pair.
+
+    Identical texts are joined by hash and every distinct pair is diffed at most once.
+    Pairs whose length or character overlap bounds rule out a ratio of at least
+    `threshold` are reported as 0 without diffing, which is exact for threshold 0.
+    """
+    n, m = len(predicted_texts), len(original_texts)
+    if n == 0 or m == 0:
+        return np.zeros((n, m))
+
+    predicted_unique, predicted_inverse = np.unique(np.array(predicted_texts, dtype=object), return_inverse=True)
+    original_unique, original_inverse = np.unique(np.array(original_texts, dtype=object), return_inverse=True)
+    return unique_text_similarity_matrix(
+        predicted_unique,
+        predicted_inverse.reshape(-1),
+        original_unique,
+        original_inverse.reshape(-1),
+        mask,
+        threshold,
+    )
+
+
+def unique_text_similarity_matrix(
+    predicted_unique: List[str],
+    predicted_inverse: np.ndarray,
+    original_unique: List[str],
+    original_inverse: np.ndarray,
+    mask: np.ndarray = None,
+    threshold: float = 0.0,
+) -> np.ndarray:
+    """
+    text_similarity_matrix of the texts predicted_unique[predicted_inverse] and
+    original_unique[original_inverse], where each list of unique texts has no repeats.
+    """
+    n, m = len(predicted_inverse), len(original_inverse)
+    if n == 0 or m == 0:
+        return np.zeros((n, m))
+
+    needed = np.ones((len(predicted_unique), len(original_unique)), dtype=bool)
+    if mask is not None:
+        needed = np.zeros_like(needed)
+        rows, cols = np.nonzero(mask)
+        needed[predicted_inverse[rows], original_inverse[cols]] = True
+
+    # Exact matches, including two empty texts, score 1 and a single empty text scores 0
+    original_index = {text: j for j, text in enumerate(original_unique)}
+    unique_similarity = np.zeros(needed.shape)
+    for i, text in enumerate(predicted_unique):
+        j = original_index.get(text)
+        if j is not None:
+            unique_similarity[i, j] = 1.0
+            needed[i, j] = False
+
+    # Same bound as SequenceMatcher.real_quick_ratio, from the lengths alone
+    predicted_lengths = np.array([len(text) for text in predicted_unique], dtype=float)
+    original_lengths = np.array([len(text) for text in original_unique], dtype=float)
+    length_sum = predicted_lengths[:, None] + original_lengths[None, :]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        length_bound = 2.0 * np.minimum(predicted_lengths[:, None], original_lengths[None, :]) / length_sum
+    needed &= length_bound > 0
+    needed &= length_bound >= threshold
+
+    for i, j in zip(*np.nonzero(needed)):
+        predicted_text, original_text = predicted_unique[i], original_unique[j]
+        bound = text_ratio_upper_bound(predicted_text, original_text)
+        if bound == 0 or bound < threshold:
+            continue
+        unique_similarity[i, j] = text_ratio(predicted_text, original_text)
+
+    similarity = unique_similarity[predicted_inverse][:, original_inverse]
+    if mask is not None:
+        similarity = np.where(mask, similarity, 0)
+    return similarity
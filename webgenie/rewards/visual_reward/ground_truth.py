@@ -0,0 +1,152 @@
+import bittensor as bt
+import numpy as np
+import os
+import pickle
+import shutil
+import time
+import uuid
+from concurrent.futures import Future
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from webgenie.constants import GROUND_TRUTH_FEATURES_DIR, GROUND_TRUTH_FEATURES_TTL, WORK_DIR
+from webgenie.helpers.htmls import html_digest
+from webgenie.rewards.visual_reward.common.browser import run_with_browser
+from webgenie.rewards.visual_reward.common.element_table import ARRAY_COLUMNS, ElementTable
+from webgenie.rewards.visual_reward.common.render_artifact import RenderArtifact, render_html_artifact
+from webgenie.rewards.visual_reward.high_level_matching_score.clip_matching_score import calculate_clip_embedding
+from webgenie.rewards.visual_reward.high_level_matching_score.histogram import compute_grayscale_histogram
+from webgenie.rewards.worker_pool import scoring_worker_pool
+
+# Arrays of the artifact itself and its element tables, whose columns are all published
+FEATURE_ARRAYS = ["clip_embedding", "histogram"]
+ELEMENT_TABLES = ["text_elements", "button_elements", "input_elements", "anchor_elements"]
+
+
+class GroundTruthFeatures(BaseModel):
+    """
+    Handle of ground truth features published under GROUND_TRUTH_FEATURES_DIR. Only the handle
+    is sent to the scoring workers, which map the arrays from disk instead of unpickling them.
+    """
+    path: str = Field(default="", description="Directory holding the published features")
+    digest: str = Field(default="", description="Digest of the ground truth html")
+
+
+def save_element_table(path: str, name: str, table: ElementTable):
+    for column in ARRAY_COLUMNS:
+        np.save(f"{path}/{name}_{column}.npy", getattr(table, column))
+
+
+def load_element_table(path: str, name: str, table: ElementTable) -> ElementTable:
+    # The columns are mapped, nothing is read until a scorer uses them
+    columns = {column: np.load(f"{path}/{name}_{column}.npy", mmap_mode="r") for column in ARRAY_COLUMNS}
+    return ElementTable(strings=table.strings, size=table.size, **columns)
+
+
+def publish_ground_truth_features(artifact: RenderArtifact, digest: str) -> GroundTruthFeatures:
+    """
+    Write the arrays of `artifact` to their own .npy files and the rest of it, stripped of
+    those arrays, next to them. The directory is renamed into place once it is complete.
+    """
+    os.makedirs(GROUND_TRUTH_FEATURES_DIR, exist_ok=True)
+    path = f"{GROUND_TRUTH_FEATURES_DIR}/{digest[:16]}_{uuid.uuid4()}"
+    tmp_path = f"{path}.tmp"
+    os.makedirs(tmp_path)
+    try:
+        stripped = {}
+        for name in FEATURE_ARRAYS:
+            value = getattr(artifact, name)
+            if value is not None:
+                np.save(f"{tmp_path}/{name}.npy", np.asarray(value))
+            stripped[name] = None
+        for name in ELEMENT_TABLES:
+            table = getattr(artifact, name)
+            save_element_table(tmp_path, name, table)
+            stripped[name] = ElementTable(strings=table.strings, size=table.size)
+        with open(f"{tmp_path}/artifact.pkl", "wb") as f:
+            pickle.dump(artifact.model_copy(update=stripped), f)
+        os.rename(tmp_path, path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return GroundTruthFeatures(path=path, digest=digest)
+
+
+def attach_ground_truth_features(features: GroundTruthFeatures) -> RenderArtifact:
+    with open(f"{features.path}/artifact.pkl", "rb") as f:
+        artifact = pickle.load(f)
+    for name in FEATURE_ARRAYS:
+        if os.path.exists(f"{features.path}/{name}.npy"):
+            setattr(artifact, name, np.load(f"{features.path}/{name}.npy", mmap_mode="r"))
+    for name in ELEMENT_TABLES:
+        setattr(artifact, name, load_element_table(features.path, name, getattr(artifact, name)))
+    return artifact
+
+
+def release_ground_truth_features(features: GroundTruthFeatures):
+    # Workers that still map the files keep them readable until they drop their artifacts
+    shutil.rmtree(features.path, ignore_errors=True)
+
+
+def release_built_features(future: Future):
+    if not future.cancelled() and future.exception() is None:
+        release_ground_truth_features(future.result())
+
+
+def discard_ground_truth_features(future: Optional[Future]):
+    """
+    Drop the features of a task that is done with or will never be scored. A build that
+    has not started is cancelled, one in progress is released as soon as it finishes.
+    """
+    if future is None or future.cancel():
+        return
+    future.add_done_callback(release_built_features)
+
+
+def sweep_ground_truth_features(max_age: float = GROUND_TRUTH_FEATURES_TTL):
+    """Remove published features older than `max_age` seconds, left behind by dropped tasks or an earlier run."""
+    if not os.path.isdir(GROUND_TRUTH_FEATURES_DIR):
+        return
+    now = time.time()
+    for name in os.listdir(GROUND_TRUTH_FEATURES_DIR):
+        path = f"{GROUND_TRUTH_FEATURES_DIR}/{name}"
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+                bt.logging.debug(f"Swept stale ground truth features {path}")
+        except OSError:
+            # Released by its task in the meantime
+            pass
+
+
+async def render_ground_truth(html_path: str) -> RenderArtifact:
+    """
+    Render the ground truth and compute everything the scorers need from it, including
+    the CLIP embedding and the histogram. The screenshots are dropped once those are known.
+    """
+    artifact = await render_html_artifact(html_path, intercept_assets=False)
+    artifact.clip_embedding = calculate_clip_embedding(artifact.inpainted_screenshot)
+    artifact.histogram = compute_grayscale_histogram(artifact.screenshot)
+    artifact.screenshot = None
+    artifact.inpainted_screenshot = None
+    return artifact
+
+
+def build_ground_truth_features(ground_truth_html: str) -> GroundTruthFeatures:
+    os.makedirs(WORK_DIR, exist_ok=True)
+    html_path = f"{WORK_DIR}/ground_truth_{uuid.uuid4()}.html"
+    with open(html_path, "w") as f:
+        f.write(ground_truth_html)
+    try:
+        artifact = run_with_browser(render_ground_truth(html_path))
+    finally:
+        os.remove(html_path)
+    return publish_ground_truth_features(artifact, html_digest(ground_truth_html))
+
+
+def submit_ground_truth_features(ground_truth_html: str) -> Future:
+    """
+    Start building the ground truth features on the scoring workers. The future resolves
+    while miners work on the task, so scoring never renders the ground truth itself.
+    """
+    return scoring_worker_pool.submit(build_ground_truth_features, ground_truth_html)
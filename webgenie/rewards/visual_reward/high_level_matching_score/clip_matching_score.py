@@ -1,15 +1,44 @@
 import bittensor as bt
 import clip
+import numpy as np
 import torch
 from PIL import Image
 
-from webgenie.constants import HTML_EXTENSION, IMAGE_EXTENSION
-from webgenie.rewards.visual_reward.common.inpaint_image import inpaint_image
+from webgenie.constants import (
+    CLIP_BATCH_SIZE,
+    CLIP_NUM_THREADS,
+    CLIP_PYRAMID_MIN_SIZE,
+)
+from webgenie.rewards.visual_reward.common.deadline import check_deadline
+from webgenie.rewards.visual_reward.common.screenshot import Screenshot
 
 
-def rescale(image_path):
+# CLIP models loaded by this process, keyed by device
+clip_models = {}
+
+
+def get_clip_model(device):
+    """Load CLIP once per process and reuse it for every later task."""
+    if device not in clip_models:
+        if device == "cpu":
+            torch.set_num_threads(CLIP_NUM_THREADS)
+        model, preprocess = clip.load("ViT-B/32", device=device)
+        model.eval()
+        clip_models[device] = (model, preprocess)
+    return clip_models[device]
+
+
+def load_image(image):
+    # Screenshots are already decoded, anything else is an image path. CLIP ends up
+    # at 224 pixels, so a reduced screenshot loses nothing it would see.
+    if isinstance(image, Screenshot):
+        return image.reduced(CLIP_PYRAMID_MIN_SIZE).to_image()
+    return Image.open(image)
+
+
+def rescale(image):
     # Load the image
-    with Image.open(image_path) as img:
+    with load_image(image) as img:
         width, height = img.size
 
         # Determine which side is shorter
@@ -54,26 +83,71 @@ def calculate_embedding_vector(image_path, model, preprocess, device):
     return image_features
     
 
-async def calculate_clip_score(predict_html_path_list, original_html_path):
+def calculate_embedding_vectors(image_list, model, preprocess, device):
+    """
+    Embed all images (screenshots or image paths) through CLIP in batches of CLIP_BATCH_SIZE.
+    Images that fail to load get None instead of an embedding.
+    """
+    images = []
+    image_indices = []
+    for i, image in enumerate(image_list):
+        try:
+            images.append(preprocess(rescale(image)))
+            image_indices.append(i)
+        except Exception as e:
+            bt.logging.error(f"Error preprocessing image {i}: {e}")
+
+    embedding_vectors = [None] * len(image_list)
+    with torch.no_grad():
+        for start in range(0, len(images), CLIP_BATCH_SIZE):
+            check_deadline()
+            batch = torch.stack(images[start:start + CLIP_BATCH_SIZE]).to(device)
+            image_features = model.encode_image(batch)
+            image_features /= image_features.norm(dim=-1, keepdim=True)
+            for offset, image_feature in enumerate(image_features):
+                embedding_vectors[image_indices[start + offset]] = image_feature.unsqueeze(0)
+    return embedding_vectors
+
+
+def calculate_clip_embedding(image) -> np.ndarray:
+    """Normalized CLIP embedding of one image, to be passed back to calculate_clip_score."""
+    device = "cpu"
+    model, preprocess = get_clip_model(device)
+    embedding_vector = calculate_embedding_vectors([image], model, preprocess, device)[0]
+    if embedding_vector is None:
+        raise ValueError(f"Failed to embed the image")
+    return embedding_vector[0].numpy()
+
+
+def calculate_clip_score(predict_images, original_image, original_embedding=None):
     
     #device = "cuda" if torch.cuda.is_available() else "cpu"
     device = "cpu"
-    model, preprocess = clip.load("ViT-B/32", device=device)
-    original_img_path = original_html_path.replace(HTML_EXTENSION, f"_inpainted{IMAGE_EXTENSION}")
-    await inpaint_image(original_html_path, original_img_path)
-    original_embedding_vector = calculate_embedding_vector(original_img_path, model, preprocess, device)
+    model, preprocess = get_clip_model(device)
+    if original_embedding is None:
+        embedding_vectors = calculate_embedding_vectors(
+            [original_image] + list(predict_images), model, preprocess, device,
+        )
+    else:
+        # The embedding may be a read-only memory map, torch wants its own copy
+        original_embedding = torch.from_numpy(np.array(original_embedding))
+        embedding_vectors = [original_embedding.unsqueeze(0).to(device)] + calculate_embedding_vectors(
+            list(predict_images), model, preprocess, device,
+        )
+    original_embedding_vector = embedding_vectors[0]
+    if original_embedding_vector is None:
+        raise ValueError(f"Failed to embed the original image")
     
     results = []
-    for predict_html_path in predict_html_path_list:
+    for i, predict_embedding_vector in enumerate(embedding_vectors[1:]):
         try:
-            predict_img_path = predict_html_path.replace(HTML_EXTENSION, f"_inpainted{IMAGE_EXTENSION}")
-            await inpaint_image(predict_html_path, predict_img_path)
-            predict_embedding_vector = calculate_embedding_vector(predict_img_path, model, preprocess, device)
+            if predict_embedding_vector is None:
+                raise ValueError("Image could not be embedded")
 
             score = (original_embedding_vector @ predict_embedding_vector.T).item()
             results.append(score)
         except Exception as e:
-            bt.logging.error(f"Error calculating clip score for {predict_html_path}: {e}")
+            bt.logging.error(f"Error calculating clip score for image {i}: {e}")
             results.append(0)
 
     return results
\ No newline at end of file
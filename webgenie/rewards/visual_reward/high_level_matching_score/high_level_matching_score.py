@@ -1,15 +1,25 @@
 import bittensor as bt
 import asyncio
 import numpy as np
+from typing import List
 
+from webgenie.rewards.visual_reward.common.render_artifact import RenderArtifact
 from webgenie.rewards.visual_reward.high_level_matching_score.clip_matching_score import calculate_clip_score
 from webgenie.rewards.visual_reward.high_level_matching_score.histogram import histogram_matching_score
 
 
-async def high_level_matching_score(predict_html_path_list, original_html_path):
+def high_level_matching_score(predict_artifacts: List[RenderArtifact], original_artifact: RenderArtifact):
     
-    clip_score = await calculate_clip_score(predict_html_path_list, original_html_path)
-    histogram_score = await histogram_matching_score(predict_html_path_list, original_html_path)
+    # A ground truth artifact may carry its features instead of its screenshots
+    clip_score = calculate_clip_score(
+        [artifact.inpainted_screenshot for artifact in predict_artifacts],
+        original_artifact.inpainted_screenshot,
+        original_artifact.clip_embedding,
+    )
+    histogram_score = histogram_matching_score(
+        [artifact.screenshot for artifact in predict_artifacts],
+        original_artifact.screenshot,
+        original_artifact.histogram,
+    )
 
     return np.array(clip_score) * 0.5 + np.array(histogram_score) * 0.5
-
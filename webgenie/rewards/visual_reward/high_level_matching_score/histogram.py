@@ -1,21 +1,16 @@
 import bittensor as bt
 import numpy as np
-from PIL import Image
 
-from webgenie.rewards.visual_reward.common.take_screenshot import take_screenshot
-from webgenie.constants import HTML_EXTENSION, IMAGE_EXTENSION
+from webgenie.constants import HISTOGRAM_PYRAMID_MIN_SIZE
+from webgenie.rewards.visual_reward.common.screenshot import Screenshot
 
 
-def compute_grayscale_histogram(image_path, bins=256):
+def compute_grayscale_histogram(screenshot: Screenshot, bins=256):
     """
-    Load the image, convert to grayscale, compute histogram.
+    Compute the histogram of the screenshot in grayscale, on a subsampled level of it.
     """
-    # Load image and convert to grayscale
-    img = Image.open(image_path).convert("L")
-    np_img = np.array(img)
-
     # Compute histogram (range 0-255)
-    hist, edges = np.histogram(np_img, bins=bins, range=(0, 256))
+    hist, edges = np.histogram(screenshot.subsampled(HISTOGRAM_PYRAMID_MIN_SIZE).luminance, bins=bins, range=(0, 256))
 
     # Normalize the histogram so it sums up to 1 (optional)
     hist = hist.astype(float)
@@ -33,21 +28,18 @@ def compare_histograms(hist1, hist2):
     return (corr + 1) / 2
 
 
-async def histogram_matching_score(predict_html_path_list, original_html_path):
-    original_img_path = original_html_path.replace(HTML_EXTENSION, IMAGE_EXTENSION)
-    await take_screenshot(original_html_path, original_img_path)
-    original_hist = compute_grayscale_histogram(original_img_path)
+def histogram_matching_score(predict_screenshots, original_screenshot, original_hist=None):
+    if original_hist is None:
+        original_hist = compute_grayscale_histogram(original_screenshot)
     
     results = []
-    for predict_html_path in predict_html_path_list:
+    for i, predict_screenshot in enumerate(predict_screenshots):
         try:
-            predict_img_path = predict_html_path.replace(HTML_EXTENSION, IMAGE_EXTENSION)
-            await take_screenshot(predict_html_path, predict_img_path)
-            predict_hist = compute_grayscale_histogram(predict_img_path)
+            predict_hist = compute_grayscale_histogram(predict_screenshot)
             similarity = compare_histograms(original_hist, predict_hist)
             results.append(similarity)
         except Exception as e:
-            bt.logging.error(f"Error calculating histogram score for {predict_html_path}: {e}")
+            bt.logging.error(f"Error calculating histogram score for screenshot {i}: {e}")
             results.append(0)
 
     return results
\ No newline at end of file
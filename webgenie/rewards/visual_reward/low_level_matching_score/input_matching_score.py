@@ -3,43 +3,47 @@ import asyncio
 import numpy as np
 from math import sqrt
 from difflib import SequenceMatcher
-from scipy.optimize import linear_sum_assignment
 from skimage.metrics import structural_similarity as ssim
 
-from webgenie.rewards.visual_reward.common.extract_html_elements import HTMLElement
-from webgenie.rewards.visual_reward.common.similarity import (
-    calculate_block_similarity,
-    calculate_visual_similarity,
-    calculate_color_similarity
+from webgenie.rewards.visual_reward.common.assignment import match_elements
+from webgenie.rewards.visual_reward.common.similarity_matrix import (
+    block_similarity_matrix,
+    block_similarity_pairs,
+    visual_similarity_matrix,
+    visual_similarity_pairs,
+    text_similarity_matrix,
+    text_similarity_pairs,
+    type_mask_matrix,
+    type_mask_pairs,
 )
 
 
-def calculate_cost(predicted_element: HTMLElement, original_element: HTMLElement):
-    if predicted_element.input_type != original_element.input_type:
-        return 0
-    placeholder_similarity = SequenceMatcher(None, predicted_element.input_placeholder, original_element.input_placeholder).ratio()
-    block_similarity = calculate_block_similarity(predicted_element, original_element)
-    visual_similarity = calculate_visual_similarity(predicted_element, original_element)
-    return placeholder_similarity * 0.5 + block_similarity * 0.3 + visual_similarity * 0.2
-
-
 def create_cost_matrix(predicted_elements, original_elements):
-    n = len(predicted_elements)
-    m = len(original_elements)
-    cost_matrix = np.zeros((n, m))
-    for i in range(n):
-        for j in range(m):
-            cost_matrix[i][j] = -calculate_cost(predicted_elements[i], original_elements[j])
-    return cost_matrix
+    # Inputs of different types never match
+    type_mask = type_mask_matrix(predicted_elements, original_elements)
+    placeholder_similarity = text_similarity_matrix(predicted_elements, original_elements, "placeholder_ids", type_mask)
+    block_similarity = block_similarity_matrix(predicted_elements, original_elements)
+    visual_similarity = visual_similarity_matrix(predicted_elements, original_elements, type_mask)
+    similarity = placeholder_similarity * 0.5 + block_similarity * 0.3 + visual_similarity * 0.2
+    return -np.where(type_mask, similarity, 0)
+
+
+def create_cost_pairs(predicted_elements, original_elements, rows, cols):
+    costs = np.zeros(len(rows))
+    # Inputs of different types never match
+    same_type = type_mask_pairs(predicted_elements, original_elements, rows, cols)
+    rows, cols = rows[same_type], cols[same_type]
+    placeholder_similarity = text_similarity_pairs(predicted_elements, original_elements, rows, cols, "placeholder_ids")
+    block_similarity = block_similarity_pairs(predicted_elements, original_elements, rows, cols)
+    visual_similarity = visual_similarity_pairs(predicted_elements, original_elements, rows, cols)
+    costs[same_type] = -(placeholder_similarity * 0.5 + block_similarity * 0.3 + visual_similarity * 0.2)
+    return costs
 
 
 def calculate_input_matching_similarity(predicted_elements, original_elements):
     try:
-        cost_matrix = create_cost_matrix(predicted_elements, original_elements)
-        row_ind, col_ind = linear_sum_assignment(cost_matrix)
-        similarity_sum = 0
-        for i , j in zip(row_ind, col_ind):
-            similarity_sum += calculate_cost(predicted_elements[i], original_elements[j])
+        _, _, costs = match_elements(predicted_elements, original_elements, create_cost_matrix, create_cost_pairs)
+        similarity_sum = -costs.sum()
         
         total_count = max(len(predicted_elements), len(original_elements))
         if total_count == 0:
@@ -1,41 +1,42 @@
 import bittensor as bt
 import numpy as np
+from typing import List
 
 from webgenie.rewards.visual_reward.low_level_matching_score.element_matching_score import calculate_element_matching_similarity
 from webgenie.rewards.visual_reward.low_level_matching_score.text_matching_score import calculate_text_matching_similarity
 from webgenie.rewards.visual_reward.low_level_matching_score.input_matching_score import calculate_input_matching_similarity
+from webgenie.rewards.visual_reward.common.deadline import check_deadline
+from webgenie.rewards.visual_reward.common.render_artifact import RenderArtifact
 
-from webgenie.rewards.visual_reward.common.extract_html_elements import extract_html_elements
 
-
-async def low_level_matching_score(predict_html_path_list, original_html_path):
+def low_level_matching_score(predict_artifacts: List[RenderArtifact], original_artifact: RenderArtifact):
     
-    (
-        original_text_elements, 
-        original_button_elements, 
-        original_input_elements, 
-        original_anchor_elements,
-    ) = await extract_html_elements(original_html_path)
+    original_text_elements = original_artifact.text_elements
+    original_button_elements = original_artifact.button_elements
+    original_input_elements = original_artifact.input_elements
+    original_anchor_elements = original_artifact.anchor_elements
     
     results = []
-    for predict_html_path in predict_html_path_list:
+    for predict_artifact in predict_artifacts:
         try:
-            (
-                predicted_text_elements, 
-                predicted_button_elements, 
-                predicted_input_elements, 
-                predicted_anchor_elements,
-            ) = await extract_html_elements(predict_html_path)
+            predicted_text_elements = predict_artifact.text_elements
+            predicted_button_elements = predict_artifact.button_elements
+            predicted_input_elements = predict_artifact.input_elements
+            predicted_anchor_elements = predict_artifact.anchor_elements
 
+            check_deadline()
             button_score = calculate_element_matching_similarity(predicted_button_elements, original_button_elements)
+            check_deadline()
             anchor_score = calculate_element_matching_similarity(predicted_anchor_elements, original_anchor_elements)
 
+            check_deadline()
             input_score = calculate_input_matching_similarity(predicted_input_elements, original_input_elements)
+            check_deadline()
             text_score = calculate_text_matching_similarity(predicted_text_elements, original_text_elements)
             score = button_score * 0.25 + input_score * 0.25 + text_score * 0.25 + anchor_score * 0.25
             results.append(score)
         except Exception as e:
-            bt.logging.error(f"Error calculating low level matching score for {predict_html_path}: {e}")
+            bt.logging.error(f"Error calculating low level matching score for {predict_artifact.html_path}: {e}")
             results.append(0)
     
-    return np.array(results)
+    return np.array(results)
\ No newline at end of file
@@ -1,51 +1,43 @@
 import numpy as np
-from scipy.optimize import linear_sum_assignment
 
-from webgenie.rewards.visual_reward.common.extract_html_elements import HTMLElement, extract_html_elements
-from webgenie.rewards.visual_reward.common.similarity import (
-    calculate_text_similarity,
-    calculate_block_similarity,
-    calculate_color_similarity,
+from webgenie.rewards.visual_reward.common.assignment import match_elements
+from webgenie.rewards.visual_reward.common.similarity_matrix import (
+    text_similarity_matrix,
+    text_similarity_pairs,
+    block_similarity_matrix,
+    block_similarity_pairs,
+    color_similarity_pairs,
 )
 
 
-def calculate_cost(predicted_element: HTMLElement, original_element: HTMLElement):
-    text_similarity = calculate_text_similarity(predicted_element, original_element)
-    block_similarity = calculate_block_similarity(predicted_element, original_element)
-    return text_similarity * 0.8 + block_similarity * 0.2
+def create_cost_matrix(predicted_elements, original_elements):
+    text_similarity = text_similarity_matrix(predicted_elements, original_elements)
+    block_similarity = block_similarity_matrix(predicted_elements, original_elements)
+    return -(text_similarity * 0.8 + block_similarity * 0.2)
 
 
-def create_cost_matrix(predicted_elements, original_elements):
-    n = len(predicted_elements)
-    m = len(original_elements)
-    cost_matrix = np.zeros((n, m))
-    for i in range(n):
-        for j in range(m):
-            cost_matrix[i][j] = -calculate_cost(predicted_elements[i], original_elements[j])
-    return cost_matrix
+def create_cost_pairs(predicted_elements, original_elements, rows, cols):
+    text_similarity = text_similarity_pairs(predicted_elements, original_elements, rows, cols)
+    block_similarity = block_similarity_pairs(predicted_elements, original_elements, rows, cols)
+    return -(text_similarity * 0.8 + block_similarity * 0.2)
 
 
 def calculate_text_matching_similarity(predicted_elements, original_elements):
-    cost_matrix = create_cost_matrix(predicted_elements, original_elements)
-    row_ind, col_ind = linear_sum_assignment(cost_matrix)
-    
-    match_count = 0
-    text_similarity_sum = 0
-    block_similarity_sum = 0
-    color_similarity_sum = 0
-
-    for i , j in zip(row_ind, col_ind):
-        text_similarity = calculate_text_similarity(predicted_elements[i], original_elements[j])
-        if text_similarity < 0.5:
-            continue
-        
-        block_similarity = calculate_block_similarity(predicted_elements[i], original_elements[j])
-        color_similarity = calculate_color_similarity(predicted_elements[i], original_elements[j])
-        
-        match_count += 1
-        text_similarity_sum += text_similarity
-        block_similarity_sum += block_similarity
-        color_similarity_sum += color_similarity
+    row_ind, col_ind, _ = match_elements(predicted_elements, original_elements, create_cost_matrix, create_cost_pairs)
+    text_similarity = text_similarity_pairs(predicted_elements, original_elements, row_ind, col_ind)
+
+    # Only pairs whose texts are similar enough count as matches
+    matched = text_similarity >= 0.5
+    row_ind, col_ind = row_ind[matched], col_ind[matched]
+    text_similarity = text_similarity[matched]
+    block_similarity = block_similarity_pairs(predicted_elements, original_elements, row_ind, col_ind)
+
+    color_similarity = color_similarity_pairs(predicted_elements.colors, original_elements.colors, row_ind, col_ind)
+
+    match_count = len(row_ind)
+    text_similarity_sum = text_similarity.sum()
+    block_similarity_sum = block_similarity.sum()
+    color_similarity_sum = color_similarity.sum()
 
     total_count = len(predicted_elements) + len(original_elements) - match_count
     if total_count == 0:
@@ -4,71 +4,153 @@
 import bittensor as bt
 import os
 import asyncio
-import multiprocessing
 import numpy as np
 import shutil
 import uuid
+from collections import Counter, OrderedDict
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
 
-from webgenie.constants import WORK_DIR
+from webgenie.constants import (
+    MATCHING_STAGE_TIMEOUT,
+    ORIGINAL_ARTIFACT_CACHE_SIZE,
+    VISUAL_SOLUTION_TIMEOUT,
+    WORK_DIR,
+)
+from webgenie.helpers.htmls import estimate_html_cost
 from webgenie.rewards.reward import Reward
-from webgenie.rewards.visual_reward.common.browser import start_browser, stop_browser
+from webgenie.rewards.visual_reward.common.browser import start_browser, run_with_browser
+from webgenie.rewards.visual_reward.common.deadline import DeadlineExceeded, deadline_scope
+from webgenie.rewards.visual_reward.common.render_artifact import RenderArtifact, render_html_artifact
+from webgenie.rewards.visual_reward.ground_truth import (
+    GroundTruthFeatures,
+    attach_ground_truth_features,
+    release_ground_truth_features,
+)
 from webgenie.rewards.visual_reward.high_level_matching_score import high_level_matching_score
 from webgenie.rewards.visual_reward.low_level_matching_score import low_level_matching_score
+from webgenie.rewards.worker_pool import scoring_worker_pool
 from webgenie.tasks import Task, ImageTask, Solution
 
 
+# Ground truth renders of this worker process, keyed by html digest or path
+original_artifacts: OrderedDict[str, RenderArtifact] = OrderedDict()
+
+
+async def get_original_artifact(
+    original_html_path: str,
+    ground_truth_features: Optional[GroundTruthFeatures],
+) -> RenderArtifact:
+    """
+    The published ground truth features, or else a render of the ground truth made
+    once per worker, however many of its solutions the worker scores.
+    """
+    key = ground_truth_features.digest if ground_truth_features is not None else original_html_path
+    if key in original_artifacts:
+        original_artifacts.move_to_end(key)
+        return original_artifacts[key]
+
+    original_artifact = None
+    if ground_truth_features is not None:
+        try:
+            original_artifact = attach_ground_truth_features(ground_truth_features)
+        except Exception as e:
+            bt.logging.warning(f"Error attaching ground truth features, rendering the ground truth instead: {e}")
+    if original_artifact is None:
+        original_artifact = await render_html_artifact(original_html_path, intercept_assets=False)
+
+    original_artifacts[key] = original_artifact
+    while len(original_artifacts) > ORIGINAL_ARTIFACT_CACHE_SIZE:
+        original_artifacts.popitem(last=False)
+    return original_artifact
+
+
 class VisualReward(Reward):
     def __init__(self):
-        pass
+        # Stage deadlines exceeded so far, by stage and then miner uid. The workers return the
+        # stage with each score, so the counts live here and survive recycled workers.
+        self.timeout_counts: dict[str, Counter] = {}
 
-    async def reward_worker(self, task: Task, solutions: List[Solution], current_work_dir: str) -> np.ndarray:
+    def get_timeout_counts(self) -> dict[str, dict[int, int]]:
+        """Stage deadlines exceeded so far, per stage and miner uid."""
+        return {stage: dict(counts) for stage, counts in self.timeout_counts.items()}
+
+    async def reward_worker(
+        self,
+        solution: Solution,
+        original_html_path: str,
+        ground_truth_features: Optional[GroundTruthFeatures],
+        current_work_dir: str,
+    ) -> float:
         await start_browser()
-        
-        original_html_path = f"{current_work_dir}/original_{uuid.uuid4()}.html"
-        with open(original_html_path, "w") as f:
-            f.write(task.ground_truth_html)
 
-        miner_html_paths = []
-        for solution in solutions:
-            path = f"{current_work_dir}/miner{solution.miner_uid}_{uuid.uuid4()}.html"
-            with open(path, "w") as f:
-                f.write(solution.html)
-            miner_html_paths.append(path)
-        try:
-            high_level_scores = await high_level_matching_score(miner_html_paths, original_html_path)
-        except Exception as e:
-            bt.logging.error(f"Error in high_level_matching_score: {e}")
-            high_level_scores = np.zeros(len(miner_html_paths))
+        miner_html_path = f"{current_work_dir}/miner{solution.miner_uid}_{uuid.uuid4()}.html"
+        with open(miner_html_path, "w") as f:
+            f.write(solution.html)
+
+        # Each html is loaded once; the scorers below only consume the render artifacts
         try:
-            low_level_scores = await low_level_matching_score(miner_html_paths, original_html_path)
-        except Exception as e:
-            bt.logging.error(f"Error in low_level_matching_score: {e}")
-            low_level_scores = np.zeros(len(miner_html_paths))
-        
-        bt.logging.debug(f"High level visual scores: {high_level_scores}")
-        bt.logging.debug(f"Low level visual scores: {low_level_scores}")
+            original_artifact = await get_original_artifact(original_html_path, ground_truth_features)
+        except DeadlineExceeded as e:
+            # Not the miner's fault, but there is nothing to compare the solution against
+            raise DeadlineExceeded(f"original_{e.stage}")
+        miner_artifacts = [await render_html_artifact(miner_html_path)]
 
-        scores = high_level_scores * 0.3 + low_level_scores * 0.7
-        await stop_browser()
-        return scores
-    
-    def sync_reward_worker(self, task: Task, solutions: List[Solution], current_work_dir: str) -> np.ndarray:
+        with deadline_scope("matching", MATCHING_STAGE_TIMEOUT):
+            try:
+                high_level_scores = high_level_matching_score(miner_artifacts, original_artifact)
+            except Exception as e:
+                bt.logging.error(f"Error in high_level_matching_score: {e}")
+                high_level_scores = np.zeros(len(miner_artifacts))
+            try:
+                low_level_scores = low_level_matching_score(miner_artifacts, original_artifact)
+            except Exception as e:
+                bt.logging.error(f"Error in low_level_matching_score: {e}")
+                low_level_scores = np.zeros(len(miner_artifacts))
+
+        bt.logging.debug(f"High level visual score of miner {solution.miner_uid}: {high_level_scores[0]}")
+        bt.logging.debug(f"Low level visual score of miner {solution.miner_uid}: {low_level_scores[0]}")
+
+        return float(high_level_scores[0] * 0.3 + low_level_scores[0] * 0.7)
+
+    def sync_reward_worker(
+        self,
+        solution: Solution,
+        original_html_path: str,
+        ground_truth_features: Optional[GroundTruthFeatures],
+        current_work_dir: str,
+    ) -> Tuple[float, Optional[str]]:
+        """
+        Score one solution, returning the score and the stage whose deadline it exceeded, if any.
+        """
         try:
-            # Timeout of 2 hours for visual reward processing
-            VISUAL_REWARD_TIMEOUT = 60 * 60 * 2 # 2 hours
-            
-            # Run the async reward worker with timeout
-            return asyncio.run(
+            # Run the async reward worker with timeout on the loop that owns the pooled browser
+            score = run_with_browser(
                 asyncio.wait_for(
-                    self.reward_worker(task, solutions, current_work_dir),
-                    timeout=VISUAL_REWARD_TIMEOUT
+                    self.reward_worker(solution, original_html_path, ground_truth_features, current_work_dir),
+                    timeout=VISUAL_SOLUTION_TIMEOUT
                 )
             )
+            return score, None
+        except DeadlineExceeded as e:
+            bt.logging.warning(f"Miner {solution.miner_uid} exceeded the {e.stage} deadline")
+            return 0, e.stage
+        except asyncio.TimeoutError:
+            bt.logging.warning(f"Miner {solution.miner_uid} exceeded the solution deadline")
+            return 0, "solution"
         except Exception as e:
             bt.logging.error(f"Error in sync_reward_worker: {e}")
-            return [0] * len(solutions)
+            return 0, None
+
+    async def get_ground_truth_features(self, task: ImageTask) -> Optional[GroundTruthFeatures]:
+        # Built on the scoring workers while the miners were solving the task
+        if task.ground_truth_features is None:
+            return None
+        try:
+            return await asyncio.wrap_future(task.ground_truth_features)
+        except (Exception, DeadlineExceeded) as e:
+            bt.logging.warning(f"Ground truth features of task {task.task_id} are unavailable, rendering it instead: {e}")
+            return None
 
     async def reward(self, task: Task, solutions: List[Solution]) -> np.ndarray:
         if not isinstance(task, ImageTask):
@@ -80,24 +162,42 @@ class VisualReward(Reward):
         current_work_dir = f"{WORK_DIR}/task_{timestamp}_{task.task_id}"
         os.makedirs(current_work_dir, exist_ok=True)
 
-        # Use ProcessPoolExecutor for parallel processing
-        with multiprocessing.Pool(processes=os.cpu_count()) as pool:
-            # Convert solutions into chunks for parallel processing
-            chunk_size = max(1, len(solutions) // os.cpu_count())
-            solution_chunks = [solutions[i:i + chunk_size] for i in range(0, len(solutions), chunk_size)]
-            
-            # Create partial tasks for each chunk
-            futures = []
-            for chunk in solution_chunks:
-                future = pool.apply_async(self.sync_reward_worker, args=(task, chunk, current_work_dir))
-                futures.append(future)
-            
-            # Gather all results
-            chunk_scores = []
-            for future in futures:
-                chunk_scores.extend(future.get())
-                
-            scores = np.array(chunk_scores)
+        # Written and published once, the workers only receive the paths
+        original_html_path = f"{current_work_dir}/original.html"
+        with open(original_html_path, "w") as f:
+            f.write(task.ground_truth_html)
+        ground_truth_features = await self.get_ground_truth_features(task)
+
+        # Every solution is its own task, the heaviest pages go first so they never trail at the end
+        try:
+            results = await scoring_worker_pool.run_each(
+                self.sync_reward_worker,
+                solutions,
+                original_html_path,
+                ground_truth_features,
+                current_work_dir,
+                costs=[estimate_html_cost(solution.html) for solution in solutions],
+            )
+        finally:
+            if ground_truth_features is not None:
+                release_ground_truth_features(ground_truth_features)
+
+        # Gather all results
+        solution_scores = []
+        task_timeouts = Counter()
+        for solution, result in zip(solutions, results):
+            if isinstance(result, BaseException):
+                bt.logging.error(f"Error in visual reward worker: {result}")
+                result = (0, None)
+            score, timed_out_stage = result
+            if timed_out_stage is not None:
+                self.timeout_counts.setdefault(timed_out_stage, Counter())[solution.miner_uid] += 1
+                task_timeouts[timed_out_stage] += 1
+            solution_scores.append(score)
+        if task_timeouts:
+            bt.logging.warning(f"Visual reward deadlines exceeded in task {task.task_id}: {dict(task_timeouts)}")
+
+        scores = np.array(solution_scores)
         # Clean up work directory and its contents
         try:
             shutil.rmtree(current_work_dir)
@@ -0,0 +1,152 @@
+import asyncio
+import bittensor as bt
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from webgenie.constants import (
+    SCORING_WORKER_COUNT,
+    SCORING_WORKER_MAX_TASKS,
+    SCORING_WORKER_START_METHOD,
+)
+
+# Imported once by the fork server, so workers start with them already loaded
+SCORING_WORKER_PRELOAD_MODULES = ["webgenie.rewards"]
+
+
+def init_scoring_worker():
+    """
+    Warm up a fresh worker: launch its pooled browser and load CLIP before the first task.
+    """
+    try:
+        from webgenie.rewards.visual_reward.common.browser import run_with_browser, start_browser
+        run_with_browser(start_browser())
+    except Exception as e:
+        bt.logging.warning(f"Error starting browser in scoring worker: {e}")
+    try:
+        from webgenie.rewards.visual_reward.high_level_matching_score.clip_matching_score import get_clip_model
+        # Same device as calculate_clip_score
+        get_clip_model("cpu")
+    except Exception as e:
+        bt.logging.warning(f"Error loading CLIP in scoring worker: {e}")
+
+
+class ScoringWorkerPool:
+    """
+    Long-lived worker processes shared by every reward that scores off the event loop.
+
+    Workers are started through a fork server with the reward modules preloaded, keep
+    their browser and models warm between tasks and are replaced one at a time after
+    `max_tasks_per_child` tasks each. The pool starts lazily on first use.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = SCORING_WORKER_COUNT,
+        max_tasks_per_child: int = SCORING_WORKER_MAX_TASKS,
+        start_method: str = SCORING_WORKER_START_METHOD,
+    ):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    def start(self):
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self):
+        if self._executor is not None:
+            return
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method == "forkserver":
+            context.set_forkserver_preload(SCORING_WORKER_PRELOAD_MODULES)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=init_scoring_worker,
+            # A worker exits after this many tasks and a fresh one takes its place, so
+            # leaks cannot pile up and there are never more than max_workers processes
+            max_tasks_per_child=self.max_tasks_per_child or None,
+        )
+        bt.logging.info(f"Started scoring worker pool with {self.max_workers} workers.")
+
+    def stop(self):
+        with self._lock:
+            if self._executor is None:
+                return
+            executor, self._executor = self._executor, None
+        executor.shutdown(wait=True, cancel_futures=True)
+        bt.logging.info(f"Stopped scoring worker pool.")
+
+    def _restart(self, executor):
+        with self._lock:
+            # Another caller may already have replaced the broken executor
+            if self._executor is not executor:
+                return
+            self._restart_locked()
+
+    def _restart_locked(self):
+        executor, self._executor = self._executor, None
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._start_locked()
+
+    def submit(self, fn, *args) -> Future:
+        # Starting and submitting happen under one lock, so concurrent callers never
+        # submit to an executor that is being shut down
+        with self._lock:
+            self._start_locked()
+            try:
+                return self._executor.submit(fn, *args)
+            except BrokenProcessPool:
+                bt.logging.warning(f"Scoring worker pool is broken, restarting it.")
+                self._restart_locked()
+                return self._executor.submit(fn, *args)
+
+    async def run(self, fn, *args):
+        future = self.submit(fn, *args)
+        executor = self._executor
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died mid-task, the next task gets a fresh pool
+            bt.logging.warning(f"Scoring worker died, restarting the pool.")
+            self._restart(executor)
+            raise
+
+    async def run_each(self, fn, items: list, *args, costs: Optional[List[float]] = None) -> list:
+        """
+        Run `fn(item, *args)` for every item as its own task, most expensive first, so idle
+        workers keep taking the next item instead of waiting on a fixed chunk. Results come
+        back in item order, with the exception in place of a failed item's result.
+        """
+        order = list(range(len(items)))
+        if costs is not None:
+            order.sort(key=lambda i: costs[i], reverse=True)
+        # Tasks are submitted in the order they are started
+        results = await asyncio.gather(
+            *[self.run(fn, items[i], *args) for i in order],
+            return_exceptions=True,
+        )
+        ordered_results = [None] * len(items)
+        for i, result in zip(order, results):
+            ordered_results[i] = result
+        return ordered_results
+
+
+scoring_worker_pool = ScoringWorkerPool()
+
+
+def start_scoring_worker_pool():
+    scoring_worker_pool.start()
+
+
+def stop_scoring_worker_pool():
+    scoring_worker_pool.stop()
@@ -25,6 +25,7 @@ from webgenie.rewards import (
     VisualReward,
     LighthouseReward,
 )
+from webgenie.rewards.visual_reward.ground_truth import submit_ground_truth_features
 from webgenie.datasets import (
     RandomWebsiteDataset,
     SyntheticDataset,
@@ -79,6 +80,8 @@ class ImageTaskGenerator(TaskGenerator):
             src=dataset_entry.src,
             task_id=hashlib.sha256(dataset_entry.url.encode()).hexdigest(),
             timeout=IMAGE_TASK_TIMEOUT,
+            # Rendered and embedded on the scoring workers while the task waits for the miners
+            ground_truth_features=submit_ground_truth_features(ground_truth_html),
         )
         
         return (
@@ -0,0 +1,71 @@
+import asyncio
+import bittensor as bt
+import numpy as np
+import time
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, Optional
+
+from webgenie.constants import CPU_METRIC_CONCURRENCY, LLM_METRIC_CONCURRENCY
+from webgenie.tasks.metric_types import CPU_METRIC_RESOURCE, LLM_METRIC_RESOURCE
+
+
+class MetricExecutor:
+    """
+    Runs the metrics of a task concurrently and records the wall time each metric took.
+
+    Metrics waiting on the same resource share its limit from `resource_limits`, so the
+    Visual and Lighthouse rewards take turns on the scoring workers while the Quality
+    reward waits on the LLM next to them. `max_concurrency` optionally caps all metrics.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        resource_limits: Optional[dict[str, int]] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        if resource_limits is None:
+            resource_limits = {
+                CPU_METRIC_RESOURCE: CPU_METRIC_CONCURRENCY,
+                LLM_METRIC_RESOURCE: LLM_METRIC_CONCURRENCY,
+            }
+        self.resource_limits = resource_limits
+        self.wall_times: dict[str, float] = {}
+
+    async def run(
+        self,
+        metrics: dict[str, Callable[[], Awaitable[np.ndarray]]],
+        resources: Optional[dict[str, str]] = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        Run every metric, `resources` naming the resource each one waits on. Metrics
+        without a resource, or with one that has no limit, are only bound by `max_concurrency`.
+        """
+        resources = resources or {}
+        # Created per call, as the generator may be driven from more than one event loop
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        resource_semaphores = {
+            resource: asyncio.Semaphore(limit) for resource, limit in self.resource_limits.items()
+        }
+
+        async def run_metric(metric_name, calculate):
+            async with AsyncExitStack() as stack:
+                resource_semaphore = resource_semaphores.get(resources.get(metric_name))
+                if resource_semaphore is not None:
+                    await stack.enter_async_context(resource_semaphore)
+                if semaphore is not None:
+                    await stack.enter_async_context(semaphore)
+                start_time = time.monotonic()
+                try:
+                    return await calculate()
+                finally:
+                    self.wall_times[metric_name] = time.monotonic() - start_time
+
+        results = await asyncio.gather(
+            *[run_metric(metric_name, calculate) for metric_name, calculate in metrics.items()]
+        )
+        bt.logging.info(
+            "Metric wall times: "
+            + ", ".join(f"{metric_name} {self.wall_times[metric_name]:.2f}s" for metric_name in metrics)
+        )
+        return dict(zip(metrics.keys(), results))
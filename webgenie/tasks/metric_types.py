@@ -1,3 +1,7 @@
 ACCURACY_METRIC_NAME = "Accuracy"
 SEO_METRIC_NAME = "Seo"
 QUALITY_METRIC_NAME = "Quality"
+
+# Resources a metric mostly waits on, each with its own concurrency limit
+CPU_METRIC_RESOURCE = "cpu"
+LLM_METRIC_RESOURCE = "llm"
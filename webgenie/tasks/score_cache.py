@@ -0,0 +1,32 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from webgenie.constants import SCORE_CACHE_SIZE
+
+
+class ScoreCache:
+    """
+    LRU cache of metric scores keyed by (task instance id, html digest, metric name),
+    so solutions with the same html are only scored once per task.
+    """
+
+    def __init__(self, max_size: int = SCORE_CACHE_SIZE):
+        self.max_size = max_size
+        self._scores: OrderedDict[Tuple[str, str, str], float] = OrderedDict()
+
+    def get(self, instance_id: str, digest: str, metric_name: str) -> Optional[float]:
+        key = (instance_id, digest, metric_name)
+        if key not in self._scores:
+            return None
+        self._scores.move_to_end(key)
+        return self._scores[key]
+
+    def set(self, instance_id: str, digest: str, metric_name: str, score: float):
+        key = (instance_id, digest, metric_name)
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.max_size:
+            self._scores.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._scores)
@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field
 
 class Task(BaseModel):
     task_id: str = Field(default="")
+    instance_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique id of this task, task_id repeats when a url is drawn again")
     timeout: float = Field(default=50)
     generator: Any = Field(default=None)
     src: str = Field(default="Unknown", description="The source of the task")
@@ -13,6 +14,7 @@ class Task(BaseModel):
 class ImageTask(Task):
     base64_image: str = Field(default="", description="The base64 encoded image")
     ground_truth_html: str = Field(default="", description="The ground truth html")
+    ground_truth_features: Any = Field(default=None, description="Future of the published ground truth features")
 
 
 class TextTask(Task):
@@ -1,8 +1,12 @@
 import bittensor as bt
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
+from webgenie.helpers.htmls import html_digest
 from webgenie.rewards import Reward
+from webgenie.tasks.metric_executor import MetricExecutor
+from webgenie.tasks.metric_types import ACCURACY_METRIC_NAME
+from webgenie.tasks.score_cache import ScoreCache
 from webgenie.tasks.solution import Solution
 from webgenie.tasks.task import Task
 
@@ -10,13 +14,96 @@ from webgenie.tasks.task import Task
 class TaskGenerator:
     def __init__(self):
         self.metrics: dict[str, Reward] = {}
+        self.score_cache = ScoreCache()
+        self.metric_executor = MetricExecutor()
 
     async def generate_task(self) -> Tuple[Task, bt.Synapse]:
         pass
-    
-    async def calculate_scores(self, task: Task, solutions: List[Solution]) -> dict[str, np.ndarray]:
-        scores: dict[str, np.ndarray] = {}
-        for metric_name, reward_model in self.metrics.items():
-            reward_scores = await reward_model.reward(task, solutions)
-            scores[metric_name] = reward_scores
+
+    async def calculate_metric_scores(
+        self,
+        task: Task,
+        solutions: List[Solution],
+        digests: List[str],
+        metric_name: str,
+    ) -> np.ndarray:
+        reward_model = self.metrics[metric_name]
+        digest_scores = {}
+        for digest in digests:
+            score = self.score_cache.get(task.instance_id, digest, metric_name)
+            if score is not None:
+                digest_scores[digest] = score
+
+        pending = {}
+        for digest, solution in zip(digests, solutions):
+            if digest not in digest_scores and digest not in pending:
+                pending[digest] = solution
+        if pending:
+            bt.logging.debug(
+                f"Scoring {len(pending)} distinct solutions out of {len(solutions)} for {metric_name}"
+            )
+            reward_scores = await reward_model.reward(task, list(pending.values()))
+            for digest, score in zip(pending.keys(), reward_scores):
+                digest_scores[digest] = score
+                # Rewards score failed and timed out solutions 0, those are tried again next time
+                if score > 0:
+                    self.score_cache.set(task.instance_id, digest, metric_name, score)
+
+        return np.array([digest_scores[digest] for digest in digests])
+
+    async def calculate_scores(
+        self,
+        task: Task,
+        solutions: List[Solution],
+        metric_names: Optional[List[str]] = None,
+        gated_metric_names: List[str] = [],
+        gate_metric_name: str = ACCURACY_METRIC_NAME,
+        gate_threshold: float = 0.4,
+    ) -> dict[str, np.ndarray]:
+        """
+        Score the solutions on `metric_names`, all metrics by default. The gated metrics are only
+        computed once the gate metric is known, and only for the solutions scoring above
+        `gate_threshold` on it. Skipped metrics and solutions score 0, every metric is returned.
+        """
+        if metric_names is None:
+            metric_names = list(self.metrics)
+        metric_names = [metric_name for metric_name in metric_names if metric_name in self.metrics]
+        gated_metric_names = [metric_name for metric_name in gated_metric_names if metric_name in metric_names]
+        ungated_metric_names = [metric_name for metric_name in metric_names if metric_name not in gated_metric_names]
+        if gated_metric_names and gate_metric_name not in ungated_metric_names:
+            ungated_metric_names.append(gate_metric_name)
+
+        # Solutions sharing a digest render the same, so each distinct html is scored once
+        digests = [html_digest(solution.html) for solution in solutions]
+        resources = {metric_name: reward_model.resource for metric_name, reward_model in self.metrics.items()}
+        scores = await self.metric_executor.run({
+            metric_name: (
+                lambda metric_name=metric_name: self.calculate_metric_scores(task, solutions, digests, metric_name)
+            )
+            for metric_name in ungated_metric_names
+        }, resources)
+
+        if gated_metric_names:
+            passed = np.nonzero(scores[gate_metric_name] > gate_threshold)[0]
+            bt.logging.debug(f"{len(passed)} of {len(solutions)} solutions passed the {gate_metric_name} gate")
+            passed_solutions = [solutions[i] for i in passed]
+            passed_digests = [digests[i] for i in passed]
+            gated_scores = {}
+            if len(passed):
+                gated_scores = await self.metric_executor.run({
+                    metric_name: (
+                        lambda metric_name=metric_name: self.calculate_metric_scores(
+                            task, passed_solutions, passed_digests, metric_name,
+                        )
+                    )
+                    for metric_name in gated_metric_names
+                }, resources)
+            for metric_name in gated_metric_names:
+                scores[metric_name] = np.zeros(len(solutions))
+                if metric_name in gated_scores:
+                    scores[metric_name][passed] = gated_scores[metric_name]
+
+        for metric_name in self.metrics:
+            if metric_name not in scores:
+                scores[metric_name] = np.zeros(len(solutions))
         return scores